@@ -1,2 +1,79 @@
+import mmap
+from contextlib import contextmanager
 from struct import Struct
 
+import numpy as np
+
+# a trade as a fixed width little endian record of timestamp, symbol, quantity and price; timestamps are
+# u64 as the milliseconds of the trade files (51300010650 and up) do not fit in a u32
+record_struct = Struct('<Q3sII')
+RECORD_DTYPE = np.dtype([('timestamp', '<u8'), ('symbol', 'S3'), ('quantity', '<u4'), ('price', '<u4')])
+CHUNK_RECORDS = 1 << 16
+
+
+def pack_trade(line):
+    timestamp, symbol, quantity, price = line.rstrip('\r\n').split(',')
+    if len(symbol) != 3:
+        raise ValueError('symbols have 3 characters, got %r' % symbol)
+    return record_struct.pack(int(timestamp), symbol.encode('ascii'), int(quantity), int(price))
+
+
+def format_trade(timestamp, symbol, quantity, price):
+    return '%d,%s,%d,%d' % (timestamp, symbol.decode('ascii'), quantity, price)
+
+
+def text_to_records(input_file, output_file):
+    # 'timestamp,symbol,quantity,price' lines to records, blank lines are skipped
+    with open(input_file) as lines, open(output_file, 'wb') as records:
+        for line in lines:
+            if line.strip():
+                records.write(pack_trade(line))
+
+
+def iter_records(file, chunk_records=CHUNK_RECORDS):
+    # (timestamp, symbol, quantity, price) tuples with symbol as bytes, read chunk_records at a time
+    while True:
+        data = file.read(chunk_records * record_struct.size)
+        if not data:
+            return
+        if len(data) % record_struct.size:
+            raise ValueError('truncated record')
+        yield from record_struct.iter_unpack(data)
+
+
+def records_to_text(input_file, output_file):
+    with open(input_file, 'rb') as records, open(output_file, 'w') as lines:
+        for trade in iter_records(records):
+            lines.write(format_trade(*trade) + '\n')
+
+
+@contextmanager
+def open_records(path):
+    # a read only structured array of all records, backed by the file through mmap
+    with open(path, 'rb') as file:
+        size = file.seek(0, 2)
+        if size % RECORD_DTYPE.itemsize:
+            raise ValueError('truncated record')
+        if not size:
+            yield np.zeros(0, dtype=RECORD_DTYPE)
+            return
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        yield np.frombuffer(buffer, dtype=RECORD_DTYPE)
+    finally:
+        try:
+            buffer.close()
+        except BufferError:
+            # arrays still referencing the map keep it open, it goes with the last of them
+            pass
+
+
+def trade_chunks(records, chunk_records=CHUNK_RECORDS):
+    # the input of the chunked trade analyzer: (timestamps, symbol keys, quantities, prices) int64 arrays,
+    # a symbol key being its bytes read as a little endian integer
+    for start in range(0, len(records), chunk_records):
+        chunk = records[start:start + chunk_records]
+        symbols = np.ascontiguousarray(chunk['symbol']).view(np.uint8).reshape(-1, 3).astype(np.uint64)
+        keys = symbols[:, 0] | symbols[:, 1] << np.uint64(8) | symbols[:, 2] << np.uint64(16)
+        yield (chunk['timestamp'].astype(np.int64), keys, chunk['quantity'].astype(np.int64),
+               chunk['price'].astype(np.int64))
@@ -0,0 +1 @@
+from compression_algorithms.file_io import open
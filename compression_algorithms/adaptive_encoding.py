@@ -0,0 +1,177 @@
+import sys
+from argparse import ArgumentParser
+from collections import namedtuple
+from decimal import Decimal
+from io import BytesIO
+from itertools import islice
+
+import numpy as np
+
+from compression_algorithms.relative_encoding import to_fixed_point, format_fixed_point
+from compression_algorithms.varint import append_varint, read_varint, zigzag_encode_array, zigzag_decode_array, \
+    varint_lengths, pack_varints, unpack_varints
+
+MAGIC = b'RADP'
+VERSION = 1
+BLOCK_SIZE = 4096
+
+# deltas of values this large could overflow int64, they are always stored as absolute values
+SAFE_MAGNITUDE = 2 ** 62
+
+Block = namedtuple('Block', 'exponent tolerance values')
+
+
+def tune(scaled):
+    # every value after the first is either a delta or an absolute value with a varint gap in
+    # front of it, the tolerance is the largest delta magnitude for which the delta is cheaper
+    if len(scaled) < 2:
+        return 0
+    previous, current = scaled[:-1], scaled[1:]
+    unsafe = (np.abs(previous) >= SAFE_MAGNITUDE) | (np.abs(current) >= SAFE_MAGNITUDE)
+    magnitudes = np.where(unsafe, np.iinfo(np.int64).max, np.abs(current - previous))
+    delta_costs = np.where(unsafe, 0, varint_lengths(zigzag_encode_array(current - previous)))
+    absolute_costs = varint_lengths(zigzag_encode_array(current)) + 1
+
+    order = np.argsort(magnitudes, kind='stable')
+    magnitudes = magnitudes[order]
+    # costs[k] has the k smallest magnitudes written as deltas and the rest as absolute values
+    costs = np.concatenate(([0], np.cumsum(delta_costs[order]))) + \
+        absolute_costs.sum() - np.concatenate(([0], np.cumsum(absolute_costs[order])))
+    # a tolerance can only split the magnitudes between two different values
+    valid = np.concatenate(([True], magnitudes[:-1] != magnitudes[1:], [True]))
+    valid[1:] &= magnitudes < np.iinfo(np.int64).max
+    best = int(np.flatnonzero(valid)[np.argmin(costs[valid])])
+    return int(magnitudes[best - 1]) if best else 0
+
+
+def encode_block(values):
+    scaled, exponent = to_fixed_point(values)
+    tolerance = tune(scaled)
+    tokens = np.empty(len(scaled), dtype=np.int64)
+    tokens[0] = scaled[0]
+    tokens[1:] = scaled[1:] - scaled[:-1]
+    absolute = np.ones(len(scaled), dtype=bool)
+    absolute[1:] = (np.abs(tokens[1:]) > tolerance) | (np.abs(scaled[1:]) >= SAFE_MAGNITUDE) | \
+        (np.abs(scaled[:-1]) >= SAFE_MAGNITUDE)
+    tokens[absolute] = scaled[absolute]
+    positions = np.flatnonzero(absolute)
+    payload = pack_varints(np.concatenate(([len(positions)], np.diff(positions, prepend=0))).astype(np.uint64)) + \
+        pack_varints(zigzag_encode_array(tokens))
+
+    buffer = bytearray()
+    for field in (len(scaled), exponent, tolerance, len(payload)):
+        append_varint(buffer, field)
+    return bytes(buffer) + payload
+
+
+def encode(values, block_size=BLOCK_SIZE):
+    # values are consumed a block at a time, each block picks its own scale and tolerance, so the
+    # input is read exactly once and may be an endless stream
+    values = iter(values)
+    for block in iter(lambda: list(islice(values, block_size)), []):
+        yield encode_block(block)
+
+
+def write_magic(file):
+    file.write(MAGIC + bytes((VERSION,)))
+
+
+def write_adaptive(file, values, block_size=BLOCK_SIZE):
+    write_magic(file)
+    count = 0
+    for block in encode(values, block_size):
+        file.write(block)
+        count += read_varint_from(block)
+    # a block of zero values marks the end, readers of sockets or pipes never have to guess
+    file.write(b'\x00')
+    return count
+
+
+def read_varint_from(data):
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value
+        shift += 7
+
+
+def read_exactly(file, size):
+    data = file.read(size)
+    while len(data) < size:
+        more = file.read(size - len(data))
+        if not more:
+            raise EOFError('truncated block')
+        data += more
+    return data
+
+
+def read_block(file):
+    count = read_varint(file)
+    if not count:
+        return None
+    exponent, tolerance, size = read_varint(file), read_varint(file), read_varint(file)
+    fields = unpack_varints(read_exactly(file, size))
+    gaps = fields[1:int(fields[0]) + 1].astype(np.int64)
+    tokens = zigzag_decode_array(fields[int(fields[0]) + 1:])
+    if len(tokens) != count:
+        raise ValueError('expected %d values, got %d' % (count, len(tokens)))
+
+    # the running sum restarts at every absolute value
+    absolute = np.zeros(count, dtype=bool)
+    absolute[np.cumsum(gaps)] = True
+    segments = np.cumsum(absolute) - 1
+    starts = np.flatnonzero(absolute)
+    sums = np.cumsum(np.where(absolute, 0, tokens))
+    return Block(exponent, tolerance, tokens[starts][segments] + sums - sums[starts][segments])
+
+
+def read_magic(file):
+    if read_exactly(file, len(MAGIC) + 1) != MAGIC + bytes((VERSION,)):
+        raise ValueError('not an adaptive relative encoding file')
+
+
+def read_blocks(file):
+    read_magic(file)
+    yield from iter(lambda: read_block(file), None)
+
+
+def decode_to_string(file):
+    for block in read_blocks(file):
+        yield from format_fixed_point(block.values, block.exponent).tolist()
+
+
+def decode(file):
+    for value in decode_to_string(file):
+        yield Decimal(value)
+
+
+def encode_tokens(tokens):
+    # one block per call, for the pipeline 'adaptive' stage
+    return encode_block(tokens) if len(tokens) else b''
+
+
+def decode_tokens(payload):
+    block = read_block(BytesIO(payload)) if payload else None
+    return format_fixed_point(block.values, block.exponent).tolist() if block else []
+
+
+def read_values(file):
+    for line in file:
+        yield from line.split()
+
+
+def main(arguments=None):
+    parser = ArgumentParser(description='One pass adaptive relative encoding of decimal values')
+    parser.add_argument('mode', choices=['encode', 'decode'])
+    parser.add_argument('--block-size', type=int, default=BLOCK_SIZE)
+    arguments = parser.parse_args(arguments)
+    if arguments.mode == 'encode':
+        write_adaptive(sys.stdout.buffer, read_values(sys.stdin), arguments.block_size)
+    else:
+        for value in decode_to_string(sys.stdin.buffer):
+            sys.stdout.write(value + '\n')
+
+
+if __name__ == '__main__':
+    main()
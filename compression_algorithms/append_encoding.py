@@ -0,0 +1,113 @@
+import os
+from collections import namedtuple
+from io import BytesIO
+from struct import Struct
+
+from compression_algorithms.adaptive_encoding import BLOCK_SIZE, encode_block, write_magic, read_magic, read_block
+from compression_algorithms.relative_encoding import format_fixed_point, to_fixed_point
+from compression_algorithms.varint import read_varint
+
+TRAILER_MAGIC = b'RAPT'
+
+# open block offset, value count, last value, exponent, tolerance, block size, magic
+trailer_struct = Struct('<QQqBQQ4s')
+
+State = namedtuple('State', 'offset count last_value exponent tolerance block_size')
+
+
+def read_state(file):
+    file.seek(0, os.SEEK_END)
+    if file.tell() < trailer_struct.size:
+        raise ValueError('no append trailer')
+    file.seek(-trailer_struct.size, os.SEEK_END)
+    *fields, magic = trailer_struct.unpack(file.read(trailer_struct.size))
+    if magic != TRAILER_MAGIC:
+        raise ValueError('no append trailer')
+    return State(*fields)
+
+
+class AppendEncoder(object):
+    # full blocks are written once and never touched again, the values of the last, still open
+    # block are rewritten with the trailer at every checkpoint, so a file appended to in many
+    # runs has exactly the bytes of one run over all of its values
+    def __init__(self, file, block_size=None, close_file=False):
+        self.file = file
+        self.close_file = close_file
+        file.seek(0, os.SEEK_END)
+        if file.tell():
+            self.resume(block_size)
+        else:
+            write_magic(file)
+            self.state = State(file.tell(), 0, 0, 0, 0, block_size or BLOCK_SIZE)
+            self.pending = []
+
+    def resume(self, block_size):
+        self.state = read_state(self.file)
+        if block_size is not None and block_size != self.state.block_size:
+            raise ValueError('file was written with blocks of %d values' % self.state.block_size)
+        self.file.seek(0)
+        read_magic(self.file)
+        self.file.seek(self.state.offset)
+        block = read_block(self.file)
+        self.pending = format_fixed_point(block.values, block.exponent).tolist() if block else []
+        if block and int(block.values[-1]) != self.state.last_value:
+            raise ValueError('append trailer does not match the open block')
+        self.state = self.state._replace(count=self.state.count - len(self.pending))
+        self.file.seek(self.state.offset)
+
+    def append(self, values):
+        block_size = self.state.block_size
+        for value in values:
+            self.pending.append(value)
+            if len(self.pending) == block_size:
+                self.write_block(self.pending, True)
+                self.pending = []
+
+    def write_block(self, values, full):
+        block = encode_block(values)
+        header = BytesIO(block)
+        read_varint(header)
+        exponent, tolerance = read_varint(header), read_varint(header)
+        last_value = int(to_fixed_point(values[-1:], exponent)[0][0])
+        self.file.write(block)
+        if full:
+            self.state = self.state._replace(offset=self.file.tell(), count=self.state.count + len(values))
+        self.state = self.state._replace(last_value=last_value, exponent=exponent, tolerance=tolerance)
+
+    def checkpoint(self):
+        if self.pending:
+            self.write_block(self.pending, False)
+        self.file.write(b'\x00')
+        state = self.state._replace(count=self.state.count + len(self.pending))
+        self.file.write(trailer_struct.pack(*state, TRAILER_MAGIC))
+        self.file.truncate()
+        self.file.flush()
+        self.file.seek(self.state.offset)
+        return state
+
+    def close(self):
+        try:
+            return self.checkpoint()
+        finally:
+            if self.close_file:
+                self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_appender(path, block_size=None):
+    return AppendEncoder(open(path, 'r+b' if os.path.exists(path) else 'w+b'), block_size, close_file=True)
+
+
+def append_file(path, values, block_size=None):
+    encoder = open_appender(path, block_size)
+    try:
+        encoder.append(values)
+    except BaseException:
+        encoder.file.close()
+        raise
+    return encoder.close().count
@@ -0,0 +1,106 @@
+import time
+from collections import namedtuple
+from itertools import islice
+
+from compression_algorithms.adaptive_encoding import read_exactly
+from compression_algorithms.pipeline import check_stages, encode_block, decode_block
+from compression_algorithms.varint import append_varint, read_varint
+
+MAGIC = b'AUTO'
+VERSION = 1
+BLOCK_SIZE = 4096
+SAMPLE_SIZE = 512
+SAMPLE_WINDOWS = 4
+TIME_BUDGET = 0.02
+
+# exact codecs give back the very tokens they were given, the others give back equal numbers in
+# possibly different text and are only kept for a block that they turn out to reproduce
+Codec = namedtuple('Codec', 'name declared exact')
+
+# the position in this list is the id written in front of every block, new codecs go at the end
+CODECS = [
+    Codec('plain', [], True),
+    Codec('rle', [('rle', {})], True),
+    Codec('huffman', [('huffman', {})], True),
+    Codec('rle+huffman', [('rle', {}), ('huffman', {})], True),
+    Codec('delta', [('adaptive', {})], False),
+    Codec('delta+rle+huffman', [('delta', {'transform_factor': 2, 'tolerance_factor': 1}), ('rle', {}),
+                                ('huffman', {})], False),
+    Codec('lz77', [('lz77_text', {})], True),
+]
+CODEC_IDS = {codec.name: index for index, codec in enumerate(CODECS)}
+
+for codec in CODECS:
+    check_stages(codec.declared)
+
+
+def sample(block, sample_size=SAMPLE_SIZE, windows=SAMPLE_WINDOWS):
+    # a few contiguous windows spread over the block, runs and deltas only show inside a window
+    if len(block) <= sample_size:
+        return block
+    width = sample_size // windows
+    step = (len(block) - width) // max(windows - 1, 1)
+    return [value for start in range(0, windows * step, step) for value in block[start:start + width]]
+
+
+def trial_sizes(values, candidates, time_budget):
+    # cheap codecs come first in CODECS, whatever does not fit the budget is not tried at all
+    sizes = {}
+    deadline = time.perf_counter() + time_budget
+    for codec_id in candidates:
+        if sizes and time.perf_counter() > deadline:
+            break
+        try:
+            sizes[codec_id] = len(encode_block(values, CODECS[codec_id].declared))
+        except (ValueError, ArithmeticError):
+            # numeric codecs reject text they cannot parse
+            continue
+    return sizes
+
+
+def encode_chosen(block, sizes):
+    for codec_id in sorted(sizes, key=lambda _: (sizes[_], _)):
+        codec = CODECS[codec_id]
+        try:
+            payload = encode_block(block, codec.declared)
+        except (ValueError, ArithmeticError):
+            continue
+        if codec.exact or decode_block(payload, codec.declared, len(block)) == block:
+            return codec_id, payload
+    return CODEC_IDS['plain'], encode_block(block, [])
+
+
+def encode_tagged(block, candidates, sample_size=SAMPLE_SIZE, time_budget=TIME_BUDGET):
+    codec_id, payload = encode_chosen(block, trial_sizes(sample(block, sample_size), candidates, time_budget))
+    buffer = bytearray()
+    append_varint(buffer, codec_id)
+    append_varint(buffer, len(block))
+    append_varint(buffer, len(payload))
+    return bytes(buffer) + payload
+
+
+def encode(values, block_size=BLOCK_SIZE, codecs=None, sample_size=SAMPLE_SIZE, time_budget=TIME_BUDGET):
+    candidates = sorted(CODEC_IDS[_] for _ in codecs) if codecs else list(range(len(CODECS)))
+    yield MAGIC + bytes((VERSION,))
+    values = iter(values)
+    for block in iter(lambda: list(islice(values, block_size)), []):
+        yield encode_tagged(block, candidates, sample_size, time_budget)
+
+
+def read_blocks(file):
+    if read_exactly(file, len(MAGIC) + 1) != MAGIC + bytes((VERSION,)):
+        raise ValueError('not an automatically encoded file')
+    # ids stay below 128, so the varint of an id is the single byte of its value
+    for first in iter(lambda: file.read(1), b''):
+        if first[0] >= len(CODECS):
+            raise ValueError('unknown codec id %d' % first[0])
+        count = read_varint(file)
+        yield first[0], count, read_exactly(file, read_varint(file))
+
+
+def decode(file):
+    for codec_id, count, payload in read_blocks(file):
+        values = decode_block(payload, CODECS[codec_id].declared, count)
+        if len(values) != count:
+            raise ValueError('block decoded to %d values instead of %d' % (len(values), count))
+        yield from values
@@ -0,0 +1,215 @@
+import bz2
+import json
+import lzma
+import platform
+import time
+import tracemalloc
+import zlib
+from argparse import ArgumentParser
+from collections import namedtuple
+from io import BytesIO
+from os import path
+from random import Random
+
+from compression_algorithms import auto_codec, relative_encoding, relative_encoding_binary, run_length_enconding, \
+    huffman_encoding, lz77_encoding, rans_encoding, pipeline
+
+HERE = path.dirname(path.abspath(__file__))
+DATASETS = {
+    'prices': path.join(HERE, 'resources', 'prices.txt'),
+    'long_list': path.join(HERE, 'test', 'resources', 'long_list.txt'),
+}
+
+Codec = namedtuple('Codec', 'encode decode numeric')
+
+codecs = {}
+
+
+def register_codec(name, encode, decode, numeric=False):
+    # encode turns a list of text values into bytes, decode turns those bytes back into values,
+    # numeric codecs only run on datasets of decimal numbers
+    codecs[name] = Codec(encode, decode, numeric)
+
+
+def text_codec(encode, decode):
+    # one token per line, run-length groups such as '(0,8)' contain commas
+    return (lambda values: '\n'.join(encode(values)).encode('utf-8'),
+            lambda data: list(decode(data.decode('utf-8').split('\n'))) if data else [])
+
+
+def compressor(module, **parameters):
+    return (lambda values: module.compress('\n'.join(values).encode('utf-8'), **parameters),
+            lambda data: module.decompress(data).decode('utf-8').split('\n'))
+
+
+def pipeline_codec(declared):
+    return (lambda values: b''.join(pipeline.encode(values, declared)),
+            lambda data: list(pipeline.decode(BytesIO(data))))
+
+
+def binary_codec(transform_factor, tolerance_factor):
+    def encode(values):
+        file = BytesIO()
+        relative_encoding_binary.encode_to_binary(file, values, transform_factor, tolerance_factor)
+        return file.getvalue()
+
+    return encode, lambda data: list(relative_encoding_binary.decode_from_binary(BytesIO(data)))
+
+
+for transform_factor, tolerance_factor in ((2, 1), (2, 0.1)):
+    parameters = 'tf=%d,tol=%s' % (transform_factor, tolerance_factor)
+    register_codec('relative_encoding[%s]' % parameters, *text_codec(
+        lambda values, t=transform_factor, f=tolerance_factor: relative_encoding.encode_to_string(values, 'A', t, f),
+        lambda tokens, t=transform_factor: relative_encoding.decode_from_string(tokens, 'A', t)), numeric=True)
+    register_codec('relative_encoding_array[%s]' % parameters, *text_codec(
+        lambda values, t=transform_factor, f=tolerance_factor: relative_encoding.encode_array_to_string(
+            values, 'A', t, f),
+        lambda tokens, t=transform_factor: relative_encoding.decode_array_from_string(tokens, 'A', t)), numeric=True)
+    register_codec('relative_encoding_binary[%s]' % parameters, *binary_codec(transform_factor, tolerance_factor),
+                   numeric=True)
+    register_codec('rans[%s]' % parameters,
+                   lambda values, t=transform_factor, f=tolerance_factor: rans_encoding.encode_values(values, t, f),
+                   lambda data: list(rans_encoding.decode_values(data)), numeric=True)
+    register_codec('pipeline[delta,rle,huffman,%s]' % parameters, *pipeline_codec(
+        [('delta', {'transform_factor': transform_factor, 'tolerance_factor': tolerance_factor}), ('rle', {}),
+         ('huffman', {})]), numeric=True)
+for repeats_trigger in (2, 3):
+    register_codec('run_length_encoding[trigger=%d]' % repeats_trigger, *text_codec(
+        lambda values, r=repeats_trigger: run_length_enconding.encode_to_string(values, r),
+        run_length_enconding.decode_from_string))
+register_codec('run_length_encoding_array', *text_codec(run_length_enconding.encode_array_to_string,
+                                                        run_length_enconding.decode_array_from_string))
+register_codec('huffman', lambda values: huffman_encoding.encode_to_bytes(values),
+               lambda data: list(huffman_encoding.decode_from_bytes(data)))
+register_codec('pipeline[rle,huffman]', *pipeline_codec([('rle', {}), ('huffman', {})]))
+register_codec('pipeline[delta,lz77,huffman]', *pipeline_codec(
+    [('delta', {'transform_factor': 2, 'tolerance_factor': 1}), ('lz77', {'min_match': 8}), ('huffman', {})]),
+    numeric=True)
+register_codec('lz77[fast]', *compressor(lz77_encoding, level='fast'))
+register_codec('lz77[best]', *compressor(lz77_encoding, level='best'))
+register_codec('auto', lambda values: b''.join(auto_codec.encode(values)),
+               lambda data: list(auto_codec.decode(BytesIO(data))))
+register_codec('zlib[6]', *compressor(zlib, level=6))
+register_codec('zlib[9]', *compressor(zlib, level=9))
+register_codec('lzma', *compressor(lzma))
+register_codec('bz2', *compressor(bz2))
+
+
+def synthetic_ticks(count=200000, seed=1):
+    # a random walk in cents with flat stretches and occasional jumps
+    random = Random(seed)
+    price = 10000
+    for _ in range(count):
+        step = random.random()
+        if step < 0.001:
+            price += random.randint(-500, 500)
+        elif step < 0.6:
+            price += random.randint(-3, 3)
+        price = max(price, 1)
+        yield '%d.%02d' % divmod(price, 100)
+
+
+def load_datasets(names, synthetic_count):
+    datasets = {}
+    for name in names:
+        if name == 'synthetic_ticks':
+            datasets[name] = list(synthetic_ticks(synthetic_count))
+        else:
+            with open(DATASETS[name]) as file:
+                datasets[name] = [_.rstrip('\r\n') for _ in file]
+    return datasets
+
+
+def is_numeric(values):
+    try:
+        relative_encoding.max_exponent(values[:1000])
+        return bool(values)
+    except ArithmeticError:
+        return False
+
+
+def measure(function, argument, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(argument)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def peak_memory(function, argument):
+    tracemalloc.start()
+    try:
+        function(argument)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmark(name, codec, dataset, values, repeat=3, memory=True):
+    size = len('\n'.join(values).encode('utf-8'))
+    encoded, encode_seconds = measure(codec.encode, values, repeat)
+    decoded, decode_seconds = measure(codec.decode, encoded, repeat)
+    return {
+        'codec': name,
+        'dataset': dataset,
+        'values': len(values),
+        'input_bytes': size,
+        'output_bytes': len(encoded),
+        'ratio': size / len(encoded) if encoded else None,
+        'encode_seconds': encode_seconds,
+        'decode_seconds': decode_seconds,
+        'encode_mb_per_second': size / encode_seconds / 1e6,
+        'decode_mb_per_second': size / decode_seconds / 1e6,
+        'encode_values_per_second': len(values) / encode_seconds,
+        'decode_values_per_second': len(values) / decode_seconds,
+        'encode_peak_bytes': peak_memory(codec.encode, values) if memory else None,
+        'decode_peak_bytes': peak_memory(codec.decode, encoded) if memory else None,
+        'decoded_values': len(decoded),
+    }
+
+
+def run_benchmarks(datasets, names=None, repeat=3, memory=True):
+    results = []
+    for dataset, values in datasets.items():
+        numeric = is_numeric(values)
+        for name in names or codecs:
+            if codecs[name].numeric and not numeric:
+                continue
+            results.append(run_benchmark(name, codecs[name], dataset, values, repeat, memory))
+    return results
+
+
+def format_results(results):
+    lines = ['%-18s %-44s %8s %10s %10s %12s %12s %10s' % (
+        'dataset', 'codec', 'ratio', 'enc MB/s', 'dec MB/s', 'enc val/s', 'dec val/s', 'peak MB')]
+    for result in results:
+        peak = max(result['encode_peak_bytes'] or 0, result['decode_peak_bytes'] or 0) / 1e6
+        lines.append('%-18s %-44s %8.2f %10.2f %10.2f %12.0f %12.0f %10.1f' % (
+            result['dataset'], result['codec'], result['ratio'] or 0, result['encode_mb_per_second'],
+            result['decode_mb_per_second'], result['encode_values_per_second'],
+            result['decode_values_per_second'], peak))
+    return '\n'.join(lines)
+
+
+def main(arguments=None):
+    parser = ArgumentParser(description='Throughput and compression ratio of compression_algorithms')
+    parser.add_argument('--datasets', nargs='+', default=['prices', 'long_list', 'synthetic_ticks'],
+                        choices=sorted(DATASETS) + ['synthetic_ticks'])
+    parser.add_argument('--codecs', nargs='+', choices=sorted(codecs))
+    parser.add_argument('--synthetic-count', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc runs')
+    parser.add_argument('--output', default='bench_results.json', help='machine readable results')
+    arguments = parser.parse_args(arguments)
+
+    results = run_benchmarks(load_datasets(arguments.datasets, arguments.synthetic_count), arguments.codecs,
+                             arguments.repeat, not arguments.no_memory)
+    print(format_results(results))
+    with open(arguments.output, 'w') as file:
+        json.dump({'python': platform.python_version(), 'machine': platform.machine(), 'time': time.time(),
+                   'results': results}, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+import numpy as np
+
+from compression_algorithms.relative_encoding import as_sequence, to_fixed_point, encode_fixed_point, decode_array
+from compression_algorithms.varint import zigzag_encode, zigzag_decode, append_varint
+
+BLOCK_SIZE = 128
+POWERS_OF_TWO = np.uint64(1) << np.arange(64, dtype=np.uint64)
+
+
+def bit_lengths(values):
+    return np.searchsorted(POWERS_OF_TWO, values, side='right')
+
+
+def pack_bits(values, width):
+    # every value becomes a row of width bits, most significant first, and the rows are packed back to back
+    if not width or not len(values):
+        return b''
+    shifts = np.arange(width - 1, -1, -1, dtype=np.uint64)
+    bits = ((values[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+    return np.packbits(bits).tobytes()
+
+
+def unpack_bits(data, count, width):
+    if not width or not count:
+        return np.zeros(count, dtype=np.uint64)
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=count * width).reshape(count, width)
+    return bits.astype(np.uint64) @ (np.uint64(1) << np.arange(width - 1, -1, -1, dtype=np.uint64))
+
+
+def choose_width(lengths):
+    # the width that minimises width bits per value plus a byte position and the high bits per exception
+    longest = int(lengths.max(initial=0))
+    widths = np.arange(longest + 1)
+    exceptions = len(lengths) - np.cumsum(np.bincount(lengths, minlength=longest + 1))
+    return int(np.argmin(len(lengths) * widths + exceptions * (8 + longest - widths))), longest
+
+
+def pack_block(values, buffer):
+    values = np.asarray(values, dtype=np.int64)
+    reference = int(values.min())
+    offsets = (values - reference).astype(np.uint64)
+    lengths = bit_lengths(offsets)
+    width, longest = choose_width(lengths)
+    exceptions = np.flatnonzero(lengths > width)
+
+    append_varint(buffer, zigzag_encode(reference))
+    buffer.append(width)
+    buffer.append(len(exceptions))
+    buffer.extend(pack_bits(offsets & ((np.uint64(1) << np.uint64(width)) - np.uint64(1)) if width < 64 else offsets,
+                            width))
+    if len(exceptions):
+        # patched exceptions: their positions and the bits above width, packed the same way
+        buffer.append(longest - width)
+        buffer.extend(exceptions.astype(np.uint8).tobytes())
+        buffer.extend(pack_bits(offsets[exceptions] >> np.uint64(width), longest - width))
+
+
+def unpack_block(data, position, count):
+    reference, position = read_varint(data, position)
+    reference = zigzag_decode(reference)
+    width, exceptions = data[position], data[position + 1]
+    position += 2
+    size = (count * width + 7) // 8
+    offsets = unpack_bits(data[position:position + size], count, width)
+    position += size
+    if exceptions:
+        high_width = data[position]
+        positions = np.frombuffer(data, dtype=np.uint8, count=exceptions, offset=position + 1)
+        position += 1 + exceptions
+        size = (exceptions * high_width + 7) // 8
+        offsets[positions] |= unpack_bits(data[position:position + size], exceptions, high_width) << np.uint64(width)
+        position += size
+    return offsets.astype(np.int64) + np.int64(reference), position
+
+
+def read_varint(data, position):
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def pack(values, block_size=BLOCK_SIZE):
+    values = np.asarray(values, dtype=np.int64)
+    if not 0 < block_size <= 256:
+        raise ValueError('block size has to be between 1 and 256')
+    buffer = bytearray()
+    append_varint(buffer, len(values))
+    append_varint(buffer, block_size)
+    for start in range(0, len(values), block_size):
+        pack_block(values[start:start + block_size], buffer)
+    return bytes(buffer)
+
+
+def unpack(data, position=0):
+    data = bytes(data)
+    count, position = read_varint(data, position)
+    block_size, position = read_varint(data, position)
+    values = np.empty(count, dtype=np.int64)
+    for start in range(0, count, block_size):
+        values[start:start + block_size], position = unpack_block(data, position, min(block_size, count - start))
+    return values
+
+
+def pack_relative(values, transform_factor=0, tolerance_factor=1, exponent=None, block_size=BLOCK_SIZE):
+    values = as_sequence(values)
+    values, exponent = to_fixed_point(values, exponent) if len(values) else ([], exponent or 0)
+    return pack_fixed_point(values, exponent, transform_factor, tolerance_factor, block_size)
+
+
+def pack_fixed_point(values, exponent, transform_factor=0, tolerance_factor=1, block_size=BLOCK_SIZE):
+    # the absolute values of relative_encoding are simply the exceptions of their blocks, their
+    # positions are kept as varint gaps in front of the packed blocks
+    encoded, absolute = encode_fixed_point(values, exponent, transform_factor, tolerance_factor)
+    buffer = bytearray()
+    append_varint(buffer, exponent)
+    append_varint(buffer, transform_factor)
+    positions = np.flatnonzero(absolute)
+    append_varint(buffer, len(positions))
+    for gap in np.diff(positions, prepend=0).tolist():
+        append_varint(buffer, gap)
+    return bytes(buffer) + pack(encoded, block_size)
+
+
+def unpack_relative(data):
+    data = bytes(data)
+    exponent, position = read_varint(data, 0)
+    transform_factor, position = read_varint(data, position)
+    count, position = read_varint(data, position)
+    gaps = []
+    for _ in range(count):
+        gap, position = read_varint(data, position)
+        gaps.append(gap)
+    encoded = unpack(data, position)
+    absolute = np.zeros(len(encoded), dtype=bool)
+    absolute[np.cumsum(gaps, dtype=np.int64)] = True
+    return decode_array(encoded, absolute, exponent, transform_factor), exponent
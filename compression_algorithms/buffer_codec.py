@@ -0,0 +1,161 @@
+import numpy as np
+
+from compression_algorithms.relative_encoding import encode_fixed_point, decode_array, POWERS_OF_TEN
+from compression_algorithms.relative_encoding_binary import MAGIC, VERSION, UNKNOWN_COUNT, header_struct, Header
+from compression_algorithms.varint import zigzag_encode, zigzag_encode_array, zigzag_decode_array, varint_lengths, \
+    pack_varints, unpack_varints
+
+CHUNK_SIZE = 1 << 16
+
+# a token is at most a 10 byte delta, or an absolute value of up to 10 coefficient bytes after its
+# exponent, which stays within 2 bytes for any exponent a fixed point int64 can have
+MAX_TOKEN_SIZE = 12
+
+# larger deltas would not fit the 64 bit token after zigzag and tag, they are written as absolute values
+SAFE_MAGNITUDE = 2 ** 61
+
+
+def as_bytes(buffer, writable=False):
+    view = memoryview(buffer)
+    if writable and view.readonly:
+        raise TypeError('output buffer is read only')
+    return np.frombuffer(view.cast('B') if view.contiguous else view.tobytes(), dtype=np.uint8)
+
+
+def as_values(buffer, writable=False):
+    view = memoryview(buffer)
+    if writable and view.readonly:
+        raise TypeError('output buffer is read only')
+    if view.format in ('q', 'l', '<q', '<l', '=q') and view.itemsize == 8:
+        return np.frombuffer(view, dtype=np.int64)
+    data = view.cast('B')
+    if len(data) % 8:
+        raise ValueError('buffer of %d bytes does not hold int64 values' % len(data))
+    return np.frombuffer(data, dtype=np.int64)
+
+
+def max_encoded_size(count):
+    return header_struct.size + count * MAX_TOKEN_SIZE
+
+
+def encode_tokens(values, previous, exponent, tolerance_factor):
+    # tokens of relative_encoding_binary with transform_factor == exponent, absolute values become
+    # their Decimal exponent token followed by sign and coefficient
+    if previous is None:
+        encoded, absolute = encode_fixed_point(values, exponent, exponent, tolerance_factor)
+    else:
+        extended = np.concatenate(([previous], values))
+        encoded, absolute = encode_fixed_point(extended, exponent, exponent, tolerance_factor)
+        encoded, absolute = encoded[1:], absolute[1:]
+    unsafe = (np.abs(encoded) >= SAFE_MAGNITUDE) & ~absolute
+    encoded = np.where(unsafe, values, encoded)
+    absolute |= unsafe
+
+    sizes = 1 + absolute
+    tokens = np.empty(int(sizes.sum()), dtype=np.uint64)
+    starts = np.cumsum(sizes) - sizes
+    magnitudes = np.abs(values[absolute]).astype(np.uint64)
+    tokens[starts[absolute]] = zigzag_encode(-exponent) << 1 | 1
+    tokens[starts[absolute] + 1] = magnitudes << np.uint64(1) | (values[absolute] < 0).astype(np.uint64)
+    tokens[starts[~absolute]] = zigzag_encode_array(encoded[~absolute]) << np.uint64(1)
+    return tokens
+
+
+def encode_into(src, dst, exponent=0, tolerance_factor=1, chunk_size=CHUNK_SIZE):
+    # src holds int64 fixed point values with exponent decimal places, dst receives a complete
+    # relative_encoding_binary stream, the number of bytes written is returned
+    values = as_values(src)
+    output = as_bytes(dst, writable=True)
+    if len(output) < header_struct.size:
+        raise ValueError('output buffer is too small')
+    header_struct.pack_into(output, 0, MAGIC, VERSION, exponent, tolerance_factor, len(values))
+    position = header_struct.size
+    previous = None
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start:start + chunk_size]
+        tokens = encode_tokens(chunk, previous, exponent, tolerance_factor)
+        lengths = varint_lengths(tokens)
+        size = int(lengths.sum())
+        if position + size > len(output):
+            raise ValueError('output buffer is too small, max_encoded_size() gives a safe size')
+        output[position:position + size] = np.frombuffer(pack_varints(tokens), dtype=np.uint8)
+        position += size
+        previous = int(chunk[-1])
+    return position
+
+
+def token_starts(tokens):
+    # a token with the lowest bit set is an absolute value and owns the following coefficient, so
+    # only those rare tokens need to be walked one by one
+    coefficients = []
+    skip = -1
+    for index in np.flatnonzero(tokens & np.uint64(1)).tolist():
+        if index != skip:
+            coefficients.append(index + 1)
+            skip = index + 1
+    starts = np.ones(len(tokens) + 1, dtype=bool)
+    starts[coefficients] = False
+    return starts[:len(tokens)], bool(coefficients) and coefficients[-1] == len(tokens)
+
+
+def decode_into(src, dst, chunk_size=CHUNK_SIZE):
+    # dst receives the int64 fixed point values, their exponent is the transform_factor of the
+    # stream header, the number of values written is returned
+    data = as_bytes(src)
+    out = as_values(dst, writable=True)
+    if len(data) < header_struct.size:
+        raise EOFError('truncated header')
+    magic, version, transform_factor, tolerance_factor, count = header_struct.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('not a relative encoding binary file')
+    header = Header(transform_factor, tolerance_factor, None if count == UNKNOWN_COUNT else count)
+
+    position = header_struct.size
+    written = previous = 0
+    while position < len(data) and (header.count is None or written < header.count):
+        window = data[position:position + chunk_size]
+        ends = np.flatnonzero(window < 0x80)
+        if not len(ends):
+            if position + chunk_size < len(data):
+                raise ValueError('varint longer than the chunk size')
+            raise EOFError('truncated varint')
+        tokens = unpack_varints(window[:ends[-1] + 1])
+        starts, incomplete = token_starts(tokens)
+        if incomplete:
+            # the coefficient of the last absolute value is in the next window
+            tokens, starts, ends = tokens[:-1], starts[:-1], ends[:-1]
+            if not len(tokens):
+                if position + chunk_size >= len(data):
+                    raise EOFError('truncated absolute value')
+                raise ValueError('varint longer than the chunk size')
+        if header.count is not None and starts.sum() > header.count - written:
+            last = np.flatnonzero(starts)[header.count - written]
+            tokens, starts, ends = tokens[:last], starts[:last], ends[:last]
+
+        indexes = np.flatnonzero(starts)
+        heads = tokens[indexes]
+        absolute = (heads & np.uint64(1)).astype(bool)
+        steps = zigzag_decode_array(heads >> np.uint64(1))
+        if absolute.any():
+            coefficients = tokens[indexes[absolute] + 1]
+            magnitudes = (coefficients >> np.uint64(1)).astype(np.int64)
+            shifts = steps[absolute] + transform_factor
+            if (shifts < 0).any():
+                raise ValueError('absolute values have more places than the transform factor')
+            if (shifts >= len(POWERS_OF_TEN)).any():
+                raise OverflowError('absolute value does not fit a 64 bit fixed point representation')
+            steps[absolute] = np.where(coefficients & np.uint64(1), -1, 1) * magnitudes * POWERS_OF_TEN[shifts]
+        decoded = decode_array(steps, absolute, transform_factor, transform_factor)
+        # values before the first absolute value of the window continue from the previous window
+        decoded[:np.argmax(absolute) if absolute.any() else len(decoded)] += previous
+
+        if written + len(decoded) > len(out):
+            raise ValueError('output buffer holds %d values, the stream has more' % len(out))
+        out[written:written + len(decoded)] = decoded
+        written += len(decoded)
+        if len(decoded):
+            previous = int(decoded[-1])
+        position += int(ends[len(tokens) - 1]) + 1 if len(tokens) else 0
+    if header.count is not None and written < header.count:
+        raise EOFError('expected %d values, got %d' % (header.count, written))
+    return written
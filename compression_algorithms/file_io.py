@@ -0,0 +1,180 @@
+import builtins
+import io
+import os
+
+from compression_algorithms import pipeline
+from compression_algorithms.adaptive_encoding import read_exactly
+from compression_algorithms.varint import append_varint, read_varint
+
+MAGIC = b'CAIO'
+VERSION = 1
+END_MAGIC = b'CEND'
+BLOCK_SIZE = 1 << 18
+
+# named stage lists, any list of pipeline stages can be passed as the codec as well
+CODECS = {
+    'lz77': [('lz77_text', {})],
+    'symbols': [('rle', {}), ('huffman', {})],
+    # one decimal value per line, values are exact and written with the most places of their block
+    'prices': [('adaptive', {})],
+    # 'timestamp,symbol,quantity,price' lines such as the trade analyzer input
+    'trades': [('trades', {})],
+}
+DEFAULT_CODEC = 'lz77'
+
+
+class CompressedWriter(io.BufferedIOBase):
+    # complete lines are encoded as one pipeline frame per block, whatever follows the last newline
+    # is kept raw in the end marker, so the file reads back with exactly the bytes written
+    def __init__(self, file, codec=DEFAULT_CODEC, block_size=BLOCK_SIZE, close_file=False):
+        self.file = file
+        self.declared = pipeline.check_stages(CODECS[codec] if isinstance(codec, str) else codec)
+        self.block_size = block_size
+        self.close_file = close_file
+        self.buffer = bytearray()
+        file.write(MAGIC + bytes((VERSION,)))
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError('write to closed file')
+        data = memoryview(data).cast('B')
+        self.buffer += data
+        if len(self.buffer) >= self.block_size:
+            self.write_lines()
+        return len(data)
+
+    def write_lines(self):
+        end = self.buffer.rfind(b'\n')
+        if end < 0:
+            return
+        lines = self.buffer[:end].decode('utf-8').split('\n')
+        del self.buffer[:end + 1]
+        self.file.write(pipeline.encode_frame(lines, self.declared))
+
+    def flush(self):
+        if self.closed:
+            raise ValueError('flush of closed file')
+        self.write_lines()
+        self.file.flush()
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self.write_lines()
+            trailer = bytearray(END_MAGIC)
+            append_varint(trailer, len(self.buffer))
+            self.file.write(trailer + self.buffer)
+            self.buffer.clear()
+        finally:
+            try:
+                super().close()
+            finally:
+                if self.close_file:
+                    self.file.close()
+
+
+class CompressedReader(io.BufferedIOBase):
+    def __init__(self, file, close_file=False):
+        self.file = file
+        self.close_file = close_file
+        if read_exactly(file, len(MAGIC) + 1) != MAGIC + bytes((VERSION,)):
+            raise ValueError('not a compressed file')
+        self.chunk = memoryview(b'')
+        self.offset = 0
+        self.finished = False
+
+    def readable(self):
+        return True
+
+    def fill(self):
+        # decodes the next frame once the current one is used up, False at the end of the file
+        if self.closed:
+            raise ValueError('read from closed file')
+        while self.offset >= len(self.chunk):
+            if self.finished:
+                return False
+            magic = read_exactly(self.file, len(MAGIC))
+            if magic == pipeline.MAGIC:
+                lines = pipeline.decode_frame(*pipeline.read_frame_body(self.file))
+                chunk = ('\n'.join(lines) + '\n').encode('utf-8')
+            elif magic == END_MAGIC:
+                chunk = read_exactly(self.file, read_varint(self.file))
+                self.finished = True
+            else:
+                raise ValueError('not a compressed frame')
+            self.chunk = memoryview(chunk)
+            self.offset = 0
+        return True
+
+    def take(self, size):
+        data = self.chunk[self.offset:self.offset + size]
+        self.offset += len(data)
+        return data
+
+    def read(self, size=-1):
+        parts = []
+        remaining = -1 if size is None or size < 0 else size
+        while remaining and self.fill():
+            parts.append(self.take(len(self.chunk) if remaining < 0 else remaining))
+            remaining -= len(parts[-1]) if remaining > 0 else 0
+        return b''.join(parts)
+
+    def read1(self, size=-1):
+        if not self.fill():
+            return b''
+        return bytes(self.take(len(self.chunk) if size is None or size < 0 else size))
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast('B')
+        written = 0
+        while written < len(view) and self.fill():
+            data = self.take(len(view) - written)
+            view[written:written + len(data)] = data
+            written += len(data)
+        return written
+
+    def peek(self, size=0):
+        if not self.fill():
+            return b''
+        return bytes(self.chunk[self.offset:])
+
+    def readline(self, size=-1):
+        parts = []
+        remaining = -1 if size is None or size < 0 else size
+        while remaining and self.fill():
+            end = bytes(self.chunk[self.offset:self.offset + (remaining if remaining > 0 else len(self.chunk))])
+            newline = end.find(b'\n')
+            parts.append(self.take(newline + 1 if newline >= 0 else len(end)))
+            remaining -= len(parts[-1]) if remaining > 0 else 0
+            if newline >= 0:
+                break
+        return b''.join(parts)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self.close_file:
+                self.file.close()
+        finally:
+            super().close()
+
+
+def open(file, mode='rb', codec=DEFAULT_CODEC, block_size=BLOCK_SIZE, encoding=None, errors=None, newline=None):
+    # like gzip.open, 'r' and 'w' are binary, 'rt' and 'wt' wrap the binary object in a TextIOWrapper
+    if mode not in ('r', 'rb', 'rt', 'w', 'wb', 'wt'):
+        raise ValueError('invalid mode %r' % mode)
+    if 't' not in mode and (encoding is not None or errors is not None or newline is not None):
+        raise ValueError('encoding, errors and newline are for text mode only')
+    named = isinstance(file, (str, bytes, os.PathLike))
+    if mode.startswith('r'):
+        binary = CompressedReader(builtins.open(file, 'rb') if named else file, close_file=named)
+    else:
+        binary = CompressedWriter(builtins.open(file, 'wb') if named else file, codec, block_size, close_file=named)
+    if 't' in mode:
+        return io.TextIOWrapper(binary, encoding, errors, newline)
+    return binary
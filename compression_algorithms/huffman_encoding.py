@@ -0,0 +1,214 @@
+from collections import Counter, deque
+from io import BytesIO
+
+from compression_algorithms.varint import append_varint, read_varint
+
+MAX_CODE_LENGTH = 15
+LOOKUP_BITS = 9
+BYTE_SYMBOLS = 0
+STRING_SYMBOLS = 1
+
+
+def code_lengths(frequencies, max_length=MAX_CODE_LENGTH):
+    frequencies = {symbol: weight for symbol, weight in frequencies.items() if weight}
+    symbols = sorted(frequencies, key=lambda _: (-frequencies[_], _))
+    if len(symbols) <= 1:
+        return dict.fromkeys(symbols, 1)
+    if len(symbols) > 1 << max_length:
+        raise ValueError('%d symbols do not fit codes of %d bits' % (len(symbols), max_length))
+
+    # classic Huffman merge over node indices, leaves first, then the depth of every leaf
+    # is the depth of its parent plus one
+    weights = [frequencies[_] for _ in symbols]
+    parents = [0] * (2 * len(symbols) - 1)
+    leaves, nodes = list(range(len(symbols))), deque()
+
+    def lightest():
+        if not nodes or leaves and weights[leaves[-1]] <= weights[nodes[0]]:
+            return leaves.pop()
+        return nodes.popleft()
+
+    for node in range(len(symbols), len(parents)):
+        first, second = lightest(), lightest()
+        parents[first] = parents[second] = node
+        weights.append(weights[first] + weights[second])
+        nodes.append(node)
+    depths = [0] * len(parents)
+    for node in range(len(parents) - 2, -1, -1):
+        depths[node] = depths[parents[node]] + 1
+
+    # lengths over the limit are folded back in the way JPEG does it (ITU T.81 annex K.3), which
+    # keeps the Kraft sum at one, then handed out again with the shortest codes going first
+    counts = Counter(depths[:len(symbols)])
+    for length in range(max(counts), max_length, -1):
+        while counts[length]:
+            shorter = length - 2
+            while not counts[shorter]:
+                shorter -= 1
+            counts[length] -= 2
+            counts[length - 1] += 1
+            counts[shorter + 1] += 2
+            counts[shorter] -= 1
+    lengths = [length for length in sorted(counts) for _ in range(counts[length])]
+    return dict(zip(symbols, lengths))
+
+
+def build_table(symbols, max_length=MAX_CODE_LENGTH):
+    return code_lengths(Counter(symbols), max_length)
+
+
+def canonical_codes(lengths):
+    codes = {}
+    code = previous_length = 0
+    for symbol in sorted(lengths, key=lambda _: (lengths[_], _)):
+        code <<= lengths[symbol] - previous_length
+        codes[symbol] = (code, lengths[symbol])
+        code += 1
+        previous_length = lengths[symbol]
+    return codes
+
+
+def serialize_table(lengths):
+    if all(isinstance(_, int) and 0 <= _ < 256 for _ in lengths):
+        kind = BYTE_SYMBOLS
+    elif all(isinstance(_, str) for _ in lengths):
+        kind = STRING_SYMBOLS
+    else:
+        raise TypeError('symbols must be all bytes or all strings')
+
+    # the table is the number of codes of every length followed by the symbols in canonical order,
+    # which is all the decoder needs to rebuild the same codes
+    max_length = max(lengths.values(), default=0)
+    counts = Counter(lengths.values())
+    buffer = bytearray((kind, max_length))
+    for length in range(1, max_length + 1):
+        append_varint(buffer, counts[length])
+    for symbol in sorted(lengths, key=lambda _: (lengths[_], _)):
+        if kind == BYTE_SYMBOLS:
+            buffer.append(symbol)
+        else:
+            data = symbol.encode('utf-8')
+            append_varint(buffer, len(data))
+            buffer.extend(data)
+    return bytes(buffer)
+
+
+def deserialize_table(file):
+    header = file.read(2)
+    if len(header) < 2:
+        raise EOFError('truncated code table')
+    kind, max_length = header
+    counts = [read_varint(file) for _ in range(max_length)]
+    lengths = {}
+    for length, count in enumerate(counts, 1):
+        for _ in range(count):
+            if kind == BYTE_SYMBOLS:
+                symbol = file.read(1)[0]
+            else:
+                size = read_varint(file)
+                symbol = file.read(size).decode('utf-8')
+            lengths[symbol] = length
+    return lengths
+
+
+def encode(symbols, lengths, chunk_size=1 << 16):
+    codes = canonical_codes(lengths)
+    bits = available = 0
+    buffer = bytearray()
+    for symbol in symbols:
+        code, length = codes[symbol]
+        bits = (bits << length) | code
+        available += length
+        while available >= 8:
+            available -= 8
+            buffer.append((bits >> available) & 0xff)
+        bits &= (1 << available) - 1
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if available:
+        buffer.append(bits << (8 - available))
+    if buffer:
+        yield bytes(buffer)
+
+
+def decoding_table(lengths, lookup_bits=LOOKUP_BITS):
+    # every code up to lookup_bits long fills all the slots it prefixes, longer codes go through
+    # a second level table indexed by the remaining bits, so one or two lookups resolve any code
+    max_length = max(lengths.values(), default=0)
+    lookup_bits = min(lookup_bits, max_length)
+    table = [None] * (1 << lookup_bits)
+    for symbol, (code, length) in canonical_codes(lengths).items():
+        if length <= lookup_bits:
+            shift = lookup_bits - length
+            for suffix in range(1 << shift):
+                table[(code << shift) | suffix] = (symbol, length)
+        else:
+            prefix = code >> (length - lookup_bits)
+            if table[prefix] is None:
+                table[prefix] = [None] * (1 << (max_length - lookup_bits))
+            shift = max_length - length
+            low = code & ((1 << (length - lookup_bits)) - 1)
+            for suffix in range(1 << shift):
+                table[prefix][(low << shift) | suffix] = (symbol, length)
+    return table, lookup_bits, max_length
+
+
+def decode(chunks, lengths, count):
+    if isinstance(chunks, (bytes, bytearray, memoryview)):
+        chunks = (chunks,)
+    table, lookup_bits, max_length = decoding_table(lengths)
+    low_mask = (1 << (max_length - lookup_bits)) - 1
+    chunks = iter(chunks)
+    chunk, position = b'', 0
+    bits = available = 0
+    for _ in range(count):
+        while available < max_length:
+            if position == len(chunk):
+                chunk, position = next(chunks, None), 0
+                if chunk is None:
+                    chunk = b''
+                    break
+            bits = (bits << 8) | chunk[position]
+            position += 1
+            available += 8
+
+        window = bits >> (available - max_length) if available >= max_length else bits << (max_length - available)
+        entry = table[window >> (max_length - lookup_bits)]
+        if entry.__class__ is list:
+            entry = entry[window & low_mask]
+        if entry is None:
+            raise ValueError('invalid Huffman code')
+        symbol, length = entry
+        if length > available:
+            raise EOFError('truncated Huffman stream')
+        available -= length
+        bits &= (1 << available) - 1
+        yield symbol
+
+
+def encode_to_bytes(symbols, max_length=MAX_CODE_LENGTH):
+    symbols = symbols if isinstance(symbols, (bytes, bytearray, list, tuple)) else list(symbols)
+    lengths = build_table(symbols, max_length)
+    payload = b''.join(encode(symbols, lengths))
+    buffer = bytearray(serialize_table(lengths))
+    append_varint(buffer, len(symbols))
+    append_varint(buffer, len(payload))
+    return bytes(buffer) + payload
+
+
+def decode_from_bytes(data, chunk_size=1 << 16):
+    file = BytesIO(data) if isinstance(data, (bytes, bytearray, memoryview)) else data
+    lengths = deserialize_table(file)
+    count = read_varint(file)
+    size = read_varint(file)
+
+    def payload(remaining):
+        while remaining:
+            chunk = file.read(min(chunk_size, remaining))
+            if not chunk:
+                raise EOFError('truncated Huffman payload')
+            remaining -= len(chunk)
+            yield chunk
+
+    yield from decode(payload(size), lengths, count)
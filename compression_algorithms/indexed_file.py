@@ -0,0 +1,73 @@
+from bisect import bisect_right
+from collections import namedtuple
+from itertools import islice
+from struct import Struct
+
+from compression_algorithms.pipeline import check_stages, encode_frame, read_frame, decode_block
+
+MAGIC = b'PIDX'
+BLOCK_SIZE = 4096
+DEFAULT_STAGES = [('delta', {'transform_factor': 2, 'tolerance_factor': 1}), ('rle', {}), ('huffman', {})]
+
+# block offset, ordinal of the first value in the block
+entry_struct = Struct('<QQ')
+# index offset, number of blocks, number of values, magic
+footer_struct = Struct('<QQQ4s')
+
+Index = namedtuple('Index', 'offsets ordinals count')
+
+
+def write_indexed(file, values, declared=DEFAULT_STAGES, block_size=BLOCK_SIZE):
+    # every block is a pipeline frame, so the delta stage restarts it at an absolute value
+    declared = check_stages(declared)
+    values = iter(values)
+    offsets, ordinals = [], []
+    count = 0
+    for block in iter(lambda: list(islice(values, block_size)), []):
+        offsets.append(file.tell())
+        ordinals.append(count)
+        file.write(encode_frame(block, declared))
+        count += len(block)
+
+    index_offset = file.tell()
+    for entry in zip(offsets, ordinals):
+        file.write(entry_struct.pack(*entry))
+    file.write(footer_struct.pack(index_offset, len(offsets), count, MAGIC))
+    return count
+
+
+def read_index(file):
+    file.seek(-footer_struct.size, 2)
+    index_offset, blocks, count, magic = footer_struct.unpack(file.read(footer_struct.size))
+    if magic != MAGIC:
+        raise ValueError('not an indexed file')
+    file.seek(index_offset)
+    entries = list(entry_struct.iter_unpack(file.read(blocks * entry_struct.size)))
+    return Index([_[0] for _ in entries], [_[1] for _ in entries], count)
+
+
+def read_block(file, index, block):
+    file.seek(index.offsets[block])
+    declared, count, payload = read_frame(file)
+    return decode_block(payload, declared, count)
+
+
+def read_range(file, start, stop, index=None):
+    index = index or read_index(file)
+    start, stop, _ = slice(start, stop).indices(index.count)
+    values = []
+    block = bisect_right(index.ordinals, start) - 1
+    while start < stop:
+        decoded = read_block(file, index, block)
+        first = index.ordinals[block]
+        values.extend(decoded[start - first:stop - first])
+        start = first + len(decoded)
+        block += 1
+    return values
+
+
+def read_value(file, position, index=None):
+    values = read_range(file, position, position + 1, index)
+    if not values:
+        raise IndexError('position %d out of range' % position)
+    return values[0]
@@ -0,0 +1,171 @@
+from collections import namedtuple
+from io import BytesIO
+
+from compression_algorithms.varint import append_varint, read_varint
+
+WINDOW = 1 << 15
+MIN_MATCH = 3
+MAX_MATCH = 258
+MATCH_MARK = '@'
+
+# max_chain bounds the candidates tried per position, a match of nice_length stops the search
+Level = namedtuple('Level', 'max_chain lazy nice_length')
+
+LEVELS = {
+    'fast': Level(8, False, 32),
+    'best': Level(256, True, MAX_MATCH),
+}
+
+
+def common_length(sequence, first, second, limit):
+    # galloping slice comparisons keep the work in C even for long matches
+    length, step = 0, 1
+    while length + step <= limit and \
+            sequence[first + length:first + length + step] == sequence[second + length:second + length + step]:
+        length += step
+        step *= 2
+    while step > 1:
+        step //= 2
+        if length + step <= limit and \
+                sequence[first + length:first + length + step] == sequence[second + length:second + length + step]:
+            length += step
+    return length
+
+
+def find_matches(sequence, window=WINDOW, level='fast', min_match=MIN_MATCH, max_match=MAX_MATCH):
+    # yields (literal start, literal end, distance, length) with a length of 0 for trailing literals,
+    # sequence has to be bytes or a tuple so that its slices are hashable
+    max_chain, lazy, nice_length = LEVELS[level]
+    size = len(sequence)
+    head = {}
+    chain = [-1] * size
+
+    def search(position):
+        limit = min(max_match, size - position)
+        if limit < min_match:
+            return 0, 0
+        best_length = best_distance = 0
+        candidate = head.get(sequence[position:position + min_match], -1)
+        tries = max_chain
+        while candidate >= 0 and position - candidate <= window and tries:
+            # a candidate can only be longer if it also agrees one element past the best match so far
+            if best_length and sequence[candidate + best_length] != sequence[position + best_length]:
+                candidate = chain[candidate]
+                tries -= 1
+                continue
+            length = common_length(sequence, candidate, position, limit)
+            if length > best_length:
+                best_length, best_distance = length, position - candidate
+                if length >= nice_length or length == limit:
+                    break
+            candidate = chain[candidate]
+            tries -= 1
+        return best_distance, best_length
+
+    def insert(position):
+        if position + min_match <= size:
+            key = sequence[position:position + min_match]
+            chain[position] = head.get(key, -1)
+            head[key] = position
+
+    literal_start = position = 0
+    distance, length = search(0)
+    insert(0)
+    while position < size:
+        if length < min_match:
+            position += 1
+            distance, length = search(position)
+            insert(position)
+            continue
+        if lazy and length < nice_length and position + 1 < size:
+            # deflate style lazy matching, a longer match one step later wins over this one
+            following = search(position + 1)
+            if following[1] > length:
+                position += 1
+                insert(position)
+                distance, length = following
+                continue
+        yield literal_start, position, distance, length
+        for inside in range(position + 1, position + length):
+            insert(inside)
+        position += length
+        literal_start = position
+        distance, length = search(position)
+        insert(position)
+    if literal_start < size:
+        yield literal_start, size, 0, 0
+
+
+def copy_match(output, distance, length):
+    start = len(output) - distance
+    if distance >= length:
+        output += output[start:start + length]
+    else:
+        # overlapping matches repeat the last distance elements
+        output += (output[start:] * (length // distance + 1))[:length]
+
+
+def compress(data, window=WINDOW, level='fast', min_match=MIN_MATCH):
+    data = bytes(data)
+    buffer = bytearray()
+    append_varint(buffer, len(data))
+    append_varint(buffer, min_match)
+    for literal_start, literal_end, distance, length in find_matches(data, window, level, min_match):
+        append_varint(buffer, literal_end - literal_start)
+        buffer.extend(data[literal_start:literal_end])
+        append_varint(buffer, length and length - min_match + 1)
+        if length:
+            append_varint(buffer, distance)
+    return bytes(buffer)
+
+
+def decompress(data):
+    file = BytesIO(data) if isinstance(data, (bytes, bytearray, memoryview)) else data
+    size = read_varint(file)
+    min_match = read_varint(file)
+    output = bytearray()
+    while len(output) < size:
+        literals = read_varint(file)
+        chunk = file.read(literals)
+        if len(chunk) < literals:
+            raise EOFError('truncated literals')
+        output += chunk
+        length = read_varint(file) if len(output) < size else 0
+        if length:
+            distance = read_varint(file)
+            if not 0 < distance <= len(output):
+                raise ValueError('match distance %d outside of the window' % distance)
+            copy_match(output, distance, length + min_match - 1)
+    if len(output) != size:
+        raise ValueError('decompressed to %d bytes instead of %d' % (len(output), size))
+    return bytes(output)
+
+
+def encode_tokens(tokens, window=WINDOW, level='fast', min_match=MIN_MATCH):
+    # a match becomes the mark followed by its length and distance as separate tokens, so that an
+    # entropy stage sees a small alphabet of numbers rather than one new symbol per match, literal
+    # tokens starting with the mark get it doubled so that they cannot be mistaken for matches
+    tokens = tuple(tokens)
+    for literal_start, literal_end, distance, length in find_matches(tokens, window, level, min_match):
+        for token in tokens[literal_start:literal_end]:
+            yield MATCH_MARK + token if token.startswith(MATCH_MARK) else token
+        if length:
+            yield MATCH_MARK
+            yield str(length)
+            yield str(distance)
+
+
+def decode_tokens(tokens):
+    output = []
+    tokens = iter(tokens)
+    for token in tokens:
+        if not token.startswith(MATCH_MARK):
+            output.append(token)
+        elif token != MATCH_MARK:
+            output.append(token[1:])
+        else:
+            length, distance = int(next(tokens, '0')), int(next(tokens, '0'))
+            if not 0 < distance <= len(output):
+                raise ValueError('match distance %d outside of the window' % distance)
+            copy_match(output, distance, length)
+    return output
@@ -0,0 +1,127 @@
+import mmap
+from contextlib import contextmanager
+from decimal import Decimal
+
+import numpy as np
+
+from compression_algorithms.relative_encoding import POWERS_OF_TEN, decode_array
+
+CHUNK_SIZE = 1 << 20
+SEPARATORS = np.frombuffer(b',\n\r ', dtype=np.uint8)
+
+
+@contextmanager
+def open_mmap(path):
+    with open(path, 'rb') as file:
+        if not file.seek(0, 2):
+            yield b''
+            return
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        yield buffer
+    finally:
+        try:
+            buffer.close()
+        except BufferError:
+            # a propagating exception can still reference a window, the map goes with the last view
+            pass
+
+
+def windows(buffer, chunk_size=CHUNK_SIZE):
+    # zero copy views of about chunk_size bytes which always end on a separator, so no token is
+    # split between two windows, a window only grows when a single token is longer than chunk_size
+    position = 0
+    while position < len(buffer):
+        size = min(chunk_size, len(buffer) - position)
+        window = np.frombuffer(buffer, dtype=np.uint8, count=size, offset=position)
+        while position + size < len(buffer) and not np.isin(window[-1], SEPARATORS):
+            cut = np.flatnonzero(np.isin(window, SEPARATORS))
+            size = int(cut[-1]) + 1 if len(cut) else min(2 * size, len(buffer) - position)
+            window = np.frombuffer(buffer, dtype=np.uint8, count=size, offset=position)
+        position += size
+        yield window
+
+
+def tokenize(window):
+    # tokens are the maximal runs of non separator bytes, returned as start and end offsets
+    inside = ~np.isin(window, SEPARATORS)
+    edges = np.diff(inside.astype(np.int8), prepend=0, append=0)
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def parse_tokens(window, starts, ends, flag_char, exponent):
+    absolute = window[ends - 1] == ord(flag_char)
+    if not len(starts):
+        return np.zeros(0, dtype=np.int64), absolute
+
+    # deltas are summed digit by digit, each digit weighted by the number of digits after it
+    digits = (window >= ord('0')) & (window <= ord('9'))
+    totals = np.cumsum(digits)
+    markers = np.zeros(len(window), dtype=np.int64)
+    markers[starts] = 1
+    token = np.cumsum(markers) - 1
+    after = totals[ends[np.maximum(token, 0)] - 1] - totals
+    widths = totals[ends - 1] - totals[starts] + digits[starts]
+    negative = window[starts] == ord('-')
+    malformed = ~absolute & ((widths != ends - starts - negative) | (widths == 0))
+    if malformed.any():
+        index = int(np.flatnonzero(malformed)[0])
+        raise ValueError('invalid token %r' % bytes(window[starts[index]:ends[index]]))
+    if (widths[~absolute] > 18).any():
+        raise OverflowError('delta does not fit a 64 bit integer')
+    weights = np.where(digits & (token >= 0),
+                       (window.astype(np.int64) - ord('0')) * POWERS_OF_TEN[np.clip(after, 0, 18)], 0)
+    encoded = np.add.reduceat(weights, starts)
+    encoded = np.where(negative, -encoded, encoded)
+
+    # absolute values are rare, they go through Decimal one at a time
+    for index in np.flatnonzero(absolute).tolist():
+        value = Decimal(bytes(window[starts[index]:ends[index] - 1]).decode('ascii')).scaleb(exponent)
+        if value != value.to_integral_value():
+            raise ValueError('absolute value has more than %d decimal places' % exponent)
+        encoded[index] = int(value)
+    return encoded, absolute
+
+
+def decode_chunks(buffer, flag_char='A', transform_factor=0, exponent=None, chunk_size=CHUNK_SIZE):
+    # yields the values of every window as an array of fixed point values scaled by 10 ** exponent
+    exponent = transform_factor if exponent is None else exponent
+    previous = 0
+    for window in windows(buffer, chunk_size):
+        starts, ends = tokenize(window)
+        encoded, absolute = parse_tokens(window, starts, ends, flag_char, exponent)
+        del window
+        decoded = decode_array(encoded, absolute, exponent, transform_factor)
+        # values before the first absolute value of the window continue from the previous window
+        decoded[:np.argmax(absolute) if absolute.any() else len(decoded)] += previous
+        if len(decoded):
+            previous = int(decoded[-1])
+        yield decoded
+
+
+def decode_mmap(path, flag_char='A', transform_factor=0, exponent=None, chunk_size=CHUNK_SIZE):
+    exponent = transform_factor if exponent is None else exponent
+    with open_mmap(path) as buffer:
+        for decoded in decode_chunks(buffer, flag_char, transform_factor, exponent, chunk_size):
+            for value in decoded.tolist():
+                yield Decimal(value).scaleb(-exponent)
+
+
+def decode_mmap_into(path, out, flag_char='A', transform_factor=0, exponent=None, chunk_size=CHUNK_SIZE):
+    written = 0
+    with open_mmap(path) as buffer:
+        for decoded in decode_chunks(buffer, flag_char, transform_factor, exponent, chunk_size):
+            if written + len(decoded) > len(out):
+                raise ValueError('output array holds %d values, the file has more' % len(out))
+            out[written:written + len(decoded)] = decoded
+            written += len(decoded)
+    return written
+
+
+def count_tokens(path, chunk_size=CHUNK_SIZE):
+    count = 0
+    with open_mmap(path) as buffer:
+        for window in windows(buffer, chunk_size):
+            count += len(tokenize(window)[0])
+            del window
+    return count
@@ -0,0 +1,48 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from os import cpu_count
+
+from compression_algorithms.pipeline import BLOCK_SIZE, check_stages, encode_frame, read_frame, decode_frame
+
+
+def ordered_map(function, arguments, workers=None, in_flight=None):
+    # at most in_flight blocks are queued or waiting to be yielded, results come back in input order
+    workers = workers or cpu_count()
+    in_flight = in_flight or 2 * workers
+    with ProcessPoolExecutor(workers) as executor:
+        pending = deque()
+        for argument in arguments:
+            pending.append(executor.submit(function, *argument))
+            if len(pending) >= in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def encode(values, declared, block_size=BLOCK_SIZE, workers=None, in_flight=None):
+    # stages are looked up by name in the workers, so custom stages have to be registered when
+    # compression_algorithms is imported there as well
+    declared = check_stages(declared)
+    values = iter(values)
+    blocks = iter(lambda: list(islice(values, block_size)), [])
+    yield from ordered_map(encode_frame, ((block, declared) for block in blocks), workers, in_flight)
+
+
+def decode(file, workers=None, in_flight=None):
+    frames = iter(lambda: read_frame(file), None)
+    for values in ordered_map(decode_frame, frames, workers, in_flight):
+        yield from values
+
+
+def encode_file(input_file, output_file, declared, block_size=BLOCK_SIZE, workers=None, in_flight=None):
+    with open(input_file) as lines, open(output_file, 'wb') as file:
+        for frame in encode((_.rstrip('\r\n') for _ in lines), declared, block_size, workers, in_flight):
+            file.write(frame)
+
+
+def decode_file(input_file, output_file, workers=None, in_flight=None):
+    with open(input_file, 'rb') as file, open(output_file, 'w') as lines:
+        for value in decode(file, workers, in_flight):
+            lines.write(value)
+            lines.write('\n')
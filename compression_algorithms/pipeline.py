@@ -0,0 +1,145 @@
+import json
+from collections import namedtuple
+from itertools import islice
+
+from compression_algorithms import adaptive_encoding, relative_encoding, run_length_enconding, huffman_encoding, \
+    lz77_encoding, rans_encoding, trade_columns
+from compression_algorithms.varint import append_varint, read_varint
+
+MAGIC = b'PFRM'
+BLOCK_SIZE = 1 << 16
+
+Stage = namedtuple('Stage', 'encode decode binary')
+
+stages = {}
+
+
+def register_stage(name, encode, decode, binary=False):
+    # encode and decode take a block (list of tokens) plus the stage parameters as keyword arguments,
+    # binary stages turn the block into bytes and have to come last
+    stages[name] = Stage(encode, decode, binary)
+
+
+register_stage('delta',
+               lambda values, **p: list(relative_encoding.encode_to_string(values, **p)),
+               lambda tokens, transform_factor=0, flag_char='A', **_: [
+                   str(_) for _ in relative_encoding.decode_from_string(tokens, flag_char, transform_factor)])
+register_stage('rle',
+               lambda tokens, **p: list(run_length_enconding.encode_to_string(tokens, **p)),
+               lambda tokens, **_: list(run_length_enconding.decode_from_string(tokens)))
+register_stage('lz77',
+               lambda tokens, **p: list(lz77_encoding.encode_tokens(tokens, **p)),
+               lambda tokens, **_: lz77_encoding.decode_tokens(tokens))
+register_stage('lz77_text',
+               lambda tokens, **p: lz77_encoding.compress('\n'.join(tokens).encode('utf-8'), **p),
+               lambda payload, **_: lz77_encoding.decompress(payload).decode('utf-8').split('\n'),
+               binary=True)
+register_stage('huffman',
+               lambda tokens, **p: huffman_encoding.encode_to_bytes(tokens, **p),
+               lambda payload, **_: list(huffman_encoding.decode_from_bytes(payload)),
+               binary=True)
+register_stage('rans',
+               lambda tokens, flag_char='A', **_: rans_encoding.encode_tokens(tokens, flag_char),
+               lambda payload, flag_char='A', **_: rans_encoding.decode_tokens(payload, flag_char),
+               binary=True)
+register_stage('adaptive',
+               lambda values, **_: adaptive_encoding.encode_tokens(values),
+               lambda payload, **_: adaptive_encoding.decode_tokens(payload),
+               binary=True)
+register_stage('trades',
+               lambda tokens, **_: trade_columns.encode_lines(tokens),
+               lambda payload, **_: trade_columns.decode_lines(payload),
+               binary=True)
+
+
+def check_stages(declared):
+    declared = [(name, dict(parameters)) for name, parameters in declared]
+    for index, (name, _) in enumerate(declared):
+        if name not in stages:
+            raise ValueError('unknown stage %r' % name)
+        if stages[name].binary and index != len(declared) - 1:
+            raise ValueError('binary stage %r has to be the last stage' % name)
+    return declared
+
+
+def encode_block(values, declared):
+    tokens = values
+    for name, parameters in declared:
+        tokens = stages[name].encode(tokens, **parameters)
+    if declared and stages[declared[-1][0]].binary:
+        return tokens
+    return '\n'.join(tokens).encode('utf-8')
+
+
+def decode_block(payload, declared, count):
+    if declared and stages[declared[-1][0]].binary:
+        tokens = payload
+    else:
+        tokens = payload.decode('utf-8').split('\n') if count else []
+    for name, parameters in reversed(declared):
+        tokens = stages[name].decode(tokens, **parameters)
+    return tokens
+
+
+def encode_frame(values, declared):
+    # a frame carries the stages with their parameters, so every block can be decoded on its own
+    description = json.dumps(declared, separators=(',', ':')).encode('utf-8')
+    payload = encode_block(values, declared)
+    buffer = bytearray(MAGIC)
+    append_varint(buffer, len(description))
+    buffer.extend(description)
+    append_varint(buffer, len(values))
+    append_varint(buffer, len(payload))
+    return bytes(buffer) + payload
+
+
+def encode(values, declared, block_size=BLOCK_SIZE):
+    declared = check_stages(declared)
+    values = iter(values)
+    for block in iter(lambda: list(islice(values, block_size)), []):
+        yield encode_frame(block, declared)
+
+
+def read_frame(file):
+    magic = file.read(len(MAGIC))
+    if not magic:
+        return None
+    if magic != MAGIC:
+        raise ValueError('not a pipeline frame')
+    return read_frame_body(file)
+
+
+def read_frame_body(file):
+    description = file.read(read_varint(file))
+    declared = check_stages(json.loads(description.decode('utf-8')))
+    count = read_varint(file)
+    size = read_varint(file)
+    payload = file.read(size)
+    if len(payload) < size:
+        raise EOFError('truncated frame')
+    return declared, count, payload
+
+
+def decode_frame(declared, count, payload):
+    values = decode_block(payload, declared, count)
+    if len(values) != count:
+        raise ValueError('frame decoded to %d values instead of %d' % (len(values), count))
+    return values
+
+
+def decode(file):
+    for frame in iter(lambda: read_frame(file), None):
+        yield from decode_frame(*frame)
+
+
+def encode_file(input_file, output_file, declared, block_size=BLOCK_SIZE):
+    with open(input_file) as lines, open(output_file, 'wb') as file:
+        for frame in encode((_.rstrip('\r\n') for _ in lines), declared, block_size):
+            file.write(frame)
+
+
+def decode_file(input_file, output_file):
+    with open(input_file, 'rb') as file, open(output_file, 'w') as lines:
+        for value in decode(file):
+            lines.write(value)
+            lines.write('\n')
@@ -0,0 +1,164 @@
+from bisect import bisect_left
+from decimal import Decimal
+from io import BytesIO
+
+import numpy as np
+
+from compression_algorithms import relative_encoding
+from compression_algorithms.relative_encoding_binary import append_token, read_token
+from compression_algorithms.varint import append_varint, read_varint, iter_varints
+
+SCALE_BITS = 12
+TOTAL = 1 << SCALE_BITS
+LOWER_BOUND = 1 << 23
+STATES = 2
+
+# deltas from -DELTA_LIMIT to DELTA_LIMIT are symbols of their own, everything else is an escape
+# symbol with the token stored in a side stream of varints
+DELTA_LIMIT = 63
+ESCAPE = 2 * DELTA_LIMIT + 1
+ALPHABET = ESCAPE + 1
+
+# the context is the magnitude of the previous delta, escapes and the first token share the last one
+CONTEXT_LIMITS = (0, 1, 3, 15)
+CONTEXTS = len(CONTEXT_LIMITS) + 1
+SYMBOL_CONTEXTS = [bisect_left(CONTEXT_LIMITS, abs(_ - DELTA_LIMIT)) for _ in range(ESCAPE)] + [CONTEXTS - 1]
+
+FIRST_REBUILD = 16
+MAX_REBUILD = 1024
+MAX_COUNT = 1 << 16
+
+
+class AdaptiveModel(object):
+    # encoder and decoder see the same symbols in the same order, so both rebuild identical tables
+    # from the counts; tables always sum to TOTAL so that coding needs no division by the total
+    def __init__(self):
+        self.counts = np.ones((CONTEXTS, ALPHABET), dtype=np.int64)
+        self.pending = [[0] * ALPHABET for _ in range(CONTEXTS)]
+        self.until_rebuild = [FIRST_REBUILD] * CONTEXTS
+        self.interval = [FIRST_REBUILD] * CONTEXTS
+        self.frequencies = [None] * CONTEXTS
+        self.starts = [None] * CONTEXTS
+        self.slots = [None] * CONTEXTS
+        for context in range(CONTEXTS):
+            self.rebuild(context)
+
+    def rebuild(self, context):
+        counts = self.counts[context]
+        counts += self.pending[context]
+        self.pending[context] = [0] * ALPHABET
+        if counts.sum() > MAX_COUNT:
+            # halving forgets old statistics so the tables follow a shifting distribution
+            counts[:] = (counts + 1) // 2
+        frequencies = 1 + counts * (TOTAL - ALPHABET) // counts.sum()
+        frequencies[np.argmax(frequencies)] += TOTAL - frequencies.sum()
+        starts = np.concatenate(([0], np.cumsum(frequencies)[:-1]))
+        self.frequencies[context] = frequencies.tolist()
+        self.starts[context] = starts.tolist()
+        self.slots[context] = np.repeat(np.arange(ALPHABET, dtype=np.uint8), frequencies).tobytes()
+
+    def update(self, context, symbol):
+        self.pending[context][symbol] += 1
+        self.until_rebuild[context] -= 1
+        if not self.until_rebuild[context]:
+            self.interval[context] = min(self.interval[context] * 2, MAX_REBUILD)
+            self.until_rebuild[context] = self.interval[context]
+            self.rebuild(context)
+
+
+def to_symbols(tokens, side):
+    for value, flag in tokens:
+        if not flag and -DELTA_LIMIT <= int(value) <= DELTA_LIMIT:
+            yield int(value) + DELTA_LIMIT
+        else:
+            append_token(side, value, flag)
+            yield ESCAPE
+
+
+def encode(tokens):
+    side = bytearray()
+    model = AdaptiveModel()
+    context = CONTEXTS - 1
+    coded = []
+    for symbol in to_symbols(tokens, side):
+        coded.append((model.starts[context][symbol], model.frequencies[context][symbol]))
+        model.update(context, symbol)
+        context = SYMBOL_CONTEXTS[symbol]
+
+    # rANS works backwards, symbols alternate between the interleaved states and all of them write
+    # into one byte stream, which the decoder then reads forwards
+    states = [LOWER_BOUND] * STATES
+    output = bytearray()
+    bound = (LOWER_BOUND >> SCALE_BITS) << 8
+    for index in range(len(coded) - 1, -1, -1):
+        start, frequency = coded[index]
+        state = states[index % STATES]
+        limit = bound * frequency
+        while state >= limit:
+            output.append(state & 0xff)
+            state >>= 8
+        states[index % STATES] = ((state // frequency) << SCALE_BITS) + state % frequency + start
+    for state in reversed(states):
+        output.extend(reversed(state.to_bytes(4, 'big')))
+    output.reverse()
+
+    buffer = bytearray()
+    append_varint(buffer, len(coded))
+    append_varint(buffer, len(side))
+    return bytes(buffer) + bytes(side) + bytes(output)
+
+
+def decode(data):
+    file = BytesIO(data)
+    count = read_varint(file)
+    side = iter_varints(BytesIO(file.read(read_varint(file))))
+    stream = file.read()
+    if len(stream) < 4 * STATES:
+        raise EOFError('truncated rANS stream')
+    states = [int.from_bytes(stream[4 * _:4 * _ + 4], 'big') for _ in range(STATES)]
+    position = 4 * STATES
+
+    model = AdaptiveModel()
+    context = CONTEXTS - 1
+    mask = TOTAL - 1
+    for index in range(count):
+        state = states[index % STATES]
+        slot = state & mask
+        symbol = model.slots[context][slot]
+        state = model.frequencies[context][symbol] * (state >> SCALE_BITS) + slot - model.starts[context][symbol]
+        while state < LOWER_BOUND:
+            if position == len(stream):
+                raise EOFError('truncated rANS stream')
+            state = (state << 8) | stream[position]
+            position += 1
+        states[index % STATES] = state
+        model.update(context, symbol)
+        context = SYMBOL_CONTEXTS[symbol]
+        if symbol == ESCAPE:
+            token = next(side, None)
+            if token is None:
+                raise EOFError('truncated escape stream')
+            yield read_token(token, side)
+        else:
+            yield (symbol - DELTA_LIMIT, False)
+
+
+def encode_tokens(tokens, flag_char='A'):
+    # the text tokens of relative_encoding.encode_to_string, as they come out of the delta stage
+    return encode((Decimal(_[:-1]), True) if _.endswith(flag_char) else (int(_), False) for _ in tokens)
+
+
+def decode_tokens(data, flag_char='A'):
+    return [''.join((str(value), flag_char)) if flag else str(value) for value, flag in decode(data)]
+
+
+def encode_values(values, transform_factor=0, tolerance_factor=1):
+    buffer = bytearray()
+    append_varint(buffer, transform_factor)
+    return bytes(buffer) + encode(relative_encoding.encode(values, transform_factor, tolerance_factor))
+
+
+def decode_values(data):
+    file = BytesIO(data)
+    transform_factor = read_varint(file)
+    yield from relative_encoding.decode(decode(file.read()), transform_factor)
@@ -1,4 +1,6 @@
-from decimal import Decimal
+from decimal import Decimal, ROUND_FLOOR
+
+import numpy as np
 
 
 def max_exponent(values):
@@ -51,3 +53,177 @@ def decode_from_string(values, flag_char='A', transform_factor=0):
                 yield (value, False)
 
     yield from decode(transform_values(values, flag_char), transform_factor)
+
+
+INT64_MAX = np.iinfo(np.int64).max
+POWERS_OF_TEN = 10 ** np.arange(19, dtype=np.int64)
+
+
+def as_text(values):
+    values = np.asarray(as_sequence(values))
+    if not values.size:
+        values = values.astype(str)
+    if values.dtype.kind == 'O' and all(isinstance(_, (str, Decimal)) for _ in values.tolist()):
+        values = values.astype(str)
+    if values.dtype.kind not in 'US':
+        raise TypeError('array mode expects decimal strings or Decimals, got %s' % values.dtype)
+    return np.char.strip(values.astype(str))
+
+
+def to_fixed_point(values, exponent=None):
+    text = as_text(values)
+    codes = np.ascontiguousarray(text).view(np.uint32).reshape(len(text), -1)
+    lengths = np.char.str_len(text)
+
+    # plain notation is parsed column by column from the character codes, anything else
+    # (exponents, nan, values too wide for the fast path) is left to Decimal
+    negative = codes[:, 0] == ord('-')
+    signed = negative | (codes[:, 0] == ord('+'))
+    digits = (codes >= ord('0')) & (codes <= ord('9'))
+    dots = codes == ord('.')
+    has_dot = dots.any(axis=1)
+    count = digits.sum(axis=1)
+    plain = (count > 0) & (dots.sum(axis=1) <= 1) & (count + has_dot + signed == lengths)
+    points = np.where(has_dot, dots.argmax(axis=1), lengths)
+    places = np.where(has_dot, lengths - points - 1, 0)
+
+    if exponent is None:
+        exponent = int(places[plain].max(initial=0))
+        if not plain.all():
+            exponent = max(exponent, max_exponent(text[~plain].tolist()))
+    if (places[plain] > exponent).any():
+        raise ValueError('values have more than %d decimal places' % exponent)
+
+    fallback = ~plain | (points - signed + exponent > 18)
+    scaled = np.zeros(len(text), dtype=np.int64)
+    for column in range(codes.shape[1]):
+        scaled = np.where(digits[:, column], scaled * 10 + (codes[:, column].astype(np.int64) - ord('0')), scaled)
+    scaled *= POWERS_OF_TEN[np.where(fallback, 0, exponent - places)]
+    scaled = np.where(negative, -scaled, scaled)
+
+    for index in np.flatnonzero(fallback).tolist():
+        value = Decimal(str(text[index])).scaleb(exponent)
+        if value != value.to_integral_value():
+            raise ValueError('%s has more than %d decimal places' % (text[index], exponent))
+        if abs(value) > INT64_MAX:
+            raise OverflowError('%s does not fit a 64 bit fixed point representation' % text[index])
+        scaled[index] = int(value)
+    return scaled, exponent
+
+
+def rescale(values, from_exponent, to_exponent):
+    if to_exponent >= from_exponent:
+        return values * 10 ** (to_exponent - from_exponent)
+    # int() truncates towards zero, floor division alone would round negative values down
+    return np.sign(values) * (np.abs(values) // 10 ** (from_exponent - to_exponent))
+
+
+def encode_array(values, transform_factor=0, tolerance_factor=1, exponent=None):
+    values = as_text(values)
+    if not values.size:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool), exponent or 0
+    values, exponent = to_fixed_point(values, exponent)
+    encoded, absolute = encode_fixed_point(values, exponent, transform_factor, tolerance_factor)
+    return encoded, absolute, exponent
+
+
+def encode_fixed_point(values, exponent, transform_factor=0, tolerance_factor=1):
+    values = np.asarray(values, dtype=np.int64)
+    differences = np.diff(values, prepend=values[:1])
+    threshold = int((Decimal(tolerance_factor) * 10 ** exponent).to_integral_value(rounding=ROUND_FLOOR))
+    absolute = np.abs(differences) > threshold
+    # encode() tests the previous value for truthiness, so a value following a zero is always absolute
+    absolute[1:] |= values[:-1] == 0
+    absolute[:1] = True
+    return np.where(absolute, values, rescale(differences, exponent, transform_factor)), absolute
+
+
+def encode_array_to_string(values, flag_char='A', transform_factor=0, tolerance_factor=1, exponent=None):
+    values = as_text(values)
+    encoded, absolute, _ = encode_array(values, transform_factor, tolerance_factor, exponent)
+    tokens = format_fixed_point(encoded, 0).astype(object)
+    # absolute values keep the text form Decimal gives them, they are rare so this stays cheap
+    tokens[absolute] = [''.join((str(Decimal(_)), flag_char)) for _ in values[absolute].tolist()]
+    return tokens.tolist()
+
+
+def decode_array(values, absolute, exponent, transform_factor=0):
+    values = np.asarray(values, dtype=np.int64)
+    absolute = np.asarray(absolute, dtype=bool)
+    steps = np.where(absolute, values, rescale(values, transform_factor, exponent))
+    totals = np.cumsum(steps)
+    # every absolute value starts a new segment: subtract whatever was accumulated before it
+    offsets = np.concatenate(([0], (totals - steps)[absolute]))
+    return totals - offsets[np.cumsum(absolute)]
+
+
+def decode_array_from_string(values, flag_char='A', transform_factor=0):
+    tokens = np.asarray(as_sequence(values), dtype=str)
+    if not tokens.size:
+        return []
+    absolute = np.char.endswith(tokens, flag_char)
+    absolute_values = [Decimal(_[:-1]) for _ in tokens[absolute].tolist()]
+    deltas, _ = to_fixed_point(np.where(absolute, '0', tokens), 0)
+
+    # places = number of decimal places of each term as decode() sees them, absolute values keep
+    # their own exponent and Decimal(delta) / 10 ** transform_factor drops trailing zeros
+    places = np.zeros(len(tokens), dtype=np.int64)
+    for power in range(1, transform_factor + 1):
+        places += deltas % 10 ** power != 0
+    places[absolute] = [-_.as_tuple().exponent for _ in absolute_values]
+    exponent = max(transform_factor, int(places.max(initial=0)))
+
+    encoded = deltas
+    encoded[absolute] = [int(_.scaleb(exponent)) for _ in absolute_values]
+    decoded = decode_array(encoded, absolute, exponent, transform_factor)
+
+    # the exponent of a Decimal sum is the smallest exponent of its terms, so the places of each
+    # decoded value are the running maximum of places since the last absolute value
+    segments = np.cumsum(absolute)
+    lowest = min(int(places.min(initial=0)), 0)
+    span = exponent - lowest + 1
+    places = np.maximum.accumulate(segments * span + places - lowest) - segments * span + lowest
+    places[segments == 0] = np.maximum(places[segments == 0], 0)
+
+    tokens = format_decimals(decoded // 10 ** (exponent - places), -places)
+    tokens[absolute] = [str(_) for _ in absolute_values]
+    return tokens.tolist()
+
+
+def format_decimals(coefficients, exponents):
+    coefficients = np.asarray(coefficients, dtype=np.int64)
+    exponents = np.asarray(exponents, dtype=np.int64)
+    tokens = np.empty(len(coefficients), dtype=object)
+    for exponent in np.unique(np.minimum(exponents, 0)).tolist():
+        selected = np.minimum(exponents, 0) == exponent
+        tokens[selected] = format_fixed_point(coefficients[selected], -exponent)
+
+    # Decimal switches to scientific notation for positive exponents and adjusted exponents below -6
+    significant = np.maximum(np.searchsorted(POWERS_OF_TEN, np.abs(coefficients), side='right'), 1)
+    scientific = (exponents > 0) | (significant - 1 + exponents < -6)
+    for index in np.flatnonzero(scientific).tolist():
+        tokens[index] = str(Decimal(int(coefficients[index])).scaleb(int(exponents[index])))
+    return tokens
+
+
+def format_fixed_point(coefficients, places):
+    # the text is assembled right to left as character codes in a space padded matrix
+    remaining = np.abs(coefficients)
+    signed = coefficients >= 0
+    width = places + (places > 0) + len(str(int(remaining.max(initial=0)))) + 1
+    units = width - 1 - places - (places > 0)
+    codes = np.full((len(coefficients), width), ord(' '), dtype=np.uint32)
+    for column in range(width - 1, -1, -1):
+        if places and column == units + 1:
+            codes[:, column] = ord('.')
+            continue
+        digit = (remaining > 0) | (column >= units)
+        sign = ~digit & ~signed
+        codes[:, column] = np.where(digit, remaining % 10 + ord('0'), np.where(sign, ord('-'), ord(' ')))
+        signed |= sign
+        remaining //= 10
+    return np.char.lstrip(codes.view('<U%d' % width).reshape(len(coefficients)), ' ')
+
+
+def as_sequence(values):
+    return values if isinstance(values, (list, tuple, np.ndarray)) else list(values)
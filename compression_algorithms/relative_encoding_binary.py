@@ -0,0 +1,102 @@
+from collections import namedtuple
+from decimal import Decimal
+from struct import Struct
+
+from compression_algorithms.relative_encoding import encode, decode
+from compression_algorithms.varint import zigzag_encode, zigzag_decode, append_varint, iter_varints
+
+MAGIC = b'RENC'
+VERSION = 1
+UNKNOWN_COUNT = 2 ** 64 - 1
+
+# magic, version, transform_factor, tolerance_factor, value count
+header_struct = Struct('<4sBbdQ')
+
+Header = namedtuple('Header', 'transform_factor tolerance_factor count')
+
+
+def write_header(file, transform_factor, tolerance_factor, count=UNKNOWN_COUNT):
+    file.write(header_struct.pack(MAGIC, VERSION, transform_factor, tolerance_factor, count))
+
+
+def read_header(file):
+    data = file.read(header_struct.size)
+    if len(data) < header_struct.size:
+        raise EOFError('truncated header')
+    magic, version, transform_factor, tolerance_factor, count = header_struct.unpack(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('not a relative encoding binary file')
+    return Header(transform_factor, tolerance_factor, None if count == UNKNOWN_COUNT else count)
+
+
+def append_token(buffer, value, flag):
+    # the lowest bit tags the token: 0 for a zigzag delta, 1 for an absolute value which is
+    # written as its zigzag exponent followed by its sign and coefficient
+    if flag:
+        sign, digits, exponent = Decimal(value).as_tuple()
+        if not isinstance(exponent, int):
+            raise ValueError('cannot encode special value %s' % value)
+        append_varint(buffer, zigzag_encode(exponent) << 1 | 1)
+        append_varint(buffer, int(''.join(map(str, digits))) << 1 | sign)
+    else:
+        append_varint(buffer, zigzag_encode(int(value)) << 1)
+
+
+def read_token(token, varints):
+    if token & 1:
+        coefficient = next(varints, None)
+        if coefficient is None:
+            raise EOFError('truncated absolute value')
+        return (Decimal((coefficient & 1, tuple(map(int, str(coefficient >> 1))), zigzag_decode(token >> 1))), True)
+    return (zigzag_decode(token >> 1), False)
+
+
+def write_binary(file, encoded, transform_factor=0, tolerance_factor=1, buffer_size=1 << 16):
+    start = file.tell() if file.seekable() else None
+    write_header(file, transform_factor, tolerance_factor)
+    count = 0
+    buffer = bytearray()
+    for value, flag in encoded:
+        append_token(buffer, value, flag)
+        count += 1
+        if len(buffer) >= buffer_size:
+            file.write(buffer)
+            buffer.clear()
+    file.write(buffer)
+
+    # streams that cannot seek keep the unknown count and are read until the end instead
+    if start is not None:
+        end = file.tell()
+        file.seek(start)
+        write_header(file, transform_factor, tolerance_factor, count)
+        file.seek(end)
+    return count
+
+
+def read_binary(file, header, chunk_size=1 << 16):
+    # a stream that cannot be rewound is read a byte at a time when it has to stop at the count
+    if header.count is not None and not file.seekable():
+        chunk_size = 1
+    varints = iter_varints(file, chunk_size)
+    count = 0
+    try:
+        while header.count is None or count < header.count:
+            token = next(varints, None)
+            if token is None:
+                if header.count is not None:
+                    raise EOFError('expected %d values, got %d' % (header.count, count))
+                return
+            yield read_token(token, varints)
+            count += 1
+    finally:
+        varints.close()
+
+
+def encode_to_binary(file, values, transform_factor=0, tolerance_factor=1):
+    return write_binary(file, encode(values, transform_factor, tolerance_factor), transform_factor,
+                        tolerance_factor)
+
+
+def decode_from_binary(file):
+    header = read_header(file)
+    yield from decode(read_binary(file, header), header.transform_factor)
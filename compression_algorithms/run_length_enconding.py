@@ -1,5 +1,7 @@
 from itertools import groupby
 
+import numpy as np
+
 
 def encode_lazy(values):
     return ((value, len(list(group))) for value, group in groupby(values))
@@ -39,7 +41,7 @@ def decode(groups):
 
 def decode_from_string(values):
     for value in values:
-        if value[0] == '(' and value[-1] == ')':
+        if value[:1] == '(' and value[-1:] == ')':
             try:
                 item, repeats = value[1:-1].split(',')
                 yield from decode(((item, int(repeats)),))
@@ -47,3 +49,65 @@ def decode_from_string(values):
                 yield value
         else:
             yield value
+
+
+def encode_array(values):
+    values = np.asarray(values)
+    if not values.size:
+        return values, np.zeros(0, dtype=np.int64)
+    if values.dtype.kind in 'iu':
+        changes = np.flatnonzero(np.diff(values))
+    else:
+        changes = np.flatnonzero(values[1:] != values[:-1])
+    starts = np.concatenate(([0], changes + 1))
+    return values[starts], np.diff(np.append(starts, len(values)))
+
+
+def decode_array(values, counts):
+    return np.repeat(np.asarray(values), counts)
+
+
+def encode_bytes(data):
+    return encode_array(np.frombuffer(data, dtype=np.uint8))
+
+
+def decode_bytes(values, counts):
+    return decode_array(np.asarray(values, dtype=np.uint8), counts).tobytes()
+
+
+def to_groups(values, counts):
+    return list(zip(np.asarray(values).tolist(), np.asarray(counts).tolist()))
+
+
+def encode_array_to_string(values, repeats_trigger=3):
+    values, counts = encode_array(values)
+    text = values.astype(str)
+    grouped = (counts > 1) & (counts >= repeats_trigger)
+    groups = np.char.add(np.char.add(np.char.add('(', text), ','), np.char.add(counts.astype(str), ')'))
+    return np.repeat(np.where(grouped, groups, text), np.where(grouped, 1, counts)).tolist()
+
+
+def decode_array_from_string(values):
+    tokens = np.asarray(values, dtype=str)
+    if not tokens.size:
+        return []
+    parts = np.char.partition(np.char.rstrip(np.char.lstrip(tokens, '('), ')'), ',')
+    items, repeats = parts[..., 0], parts[..., 2]
+    grouped = (np.char.startswith(tokens, '(') & np.char.endswith(tokens, ')') & (np.char.str_len(tokens) > 1) &
+               (parts[..., 1] == ',') & (np.char.find(repeats, ',') < 0))
+    # lstrip/rstrip above may eat more than one parenthesis, those tokens take the slow path as well
+    unusual = grouped & ((np.char.str_len(items) + np.char.str_len(repeats) + 3 != np.char.str_len(tokens)) |
+                         ~np.char.isdigit(repeats))
+    counts = np.ones(len(tokens), dtype=np.int64)
+    counts[grouped & ~unusual] = repeats[grouped & ~unusual].astype(np.int64)
+    items = np.where(grouped, items, tokens).astype(object)
+    for index in np.flatnonzero(unusual).tolist():
+        items[index], counts[index] = tokens[index], 1
+        item, count = str(tokens[index])[1:-1], None
+        try:
+            item, count = item.split(',')
+            count = int(count)
+        except ValueError:
+            continue
+        items[index], counts[index] = item, max(count, 0)
+    return np.repeat(items, counts).tolist()
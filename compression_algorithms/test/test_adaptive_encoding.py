@@ -0,0 +1,86 @@
+from unittest import TestCase, main
+from decimal import Decimal
+from io import BytesIO, RawIOBase
+from random import choice, randint
+from compression_algorithms.adaptive_encoding import tune, write_adaptive, read_blocks, decode, decode_to_string
+from compression_algorithms.benchmark import synthetic_ticks
+from compression_algorithms.relative_encoding_binary import encode_to_binary
+import numpy as np
+
+
+class ShortReads(RawIOBase):
+    # behaves like a socket or a pipe, reads return at most a few bytes and there is no seeking
+    def __init__(self, data):
+        self.data = BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        return self.data.read(min(size, 3) if size >= 0 else size)
+
+
+class TestAdaptiveEncoding(TestCase):
+    def setUp(self):
+        self.prices = open('resources/prices.txt', 'r').read().split()
+        self.ticks = list(synthetic_ticks(20000))
+
+    def test_tune(self):
+        self.assertEqual(0, tune(np.array([5], dtype=np.int64)))
+        # a fall to a small value is cheaper as an absolute value than as a delta, small steps are not
+        self.assertEqual(3, tune(np.array([900000, 900001, 900004, 900002, 5, 6], dtype=np.int64)))
+
+    def test_prices(self):
+        file = BytesIO()
+        self.assertEqual(len(self.prices), write_adaptive(file, self.prices))
+        file.seek(0)
+        self.assertEqual([Decimal(_) for _ in self.prices], list(decode(file)))
+
+    def test_block_parameters(self):
+        values = ['1.5', '1.25', '1.5'] * 10 + ['100', '101', '5000']
+        file = BytesIO()
+        write_adaptive(file, values, block_size=30)
+        file.seek(0)
+        blocks = list(read_blocks(file))
+        self.assertEqual([2, 0], [_.exponent for _ in blocks])
+        self.assertEqual([150, 125, 150], blocks[0].values[:3].tolist())
+        self.assertEqual(['100', '101', '5000'], list(decode_to_string(BytesIO(file.getvalue())))[30:])
+
+    def test_size_without_tuning(self):
+        # as small as the best hand picked parameters and far from the bloat of poor ones
+        file = BytesIO()
+        write_adaptive(file, self.ticks)
+        sizes = {}
+        for parameters in ((2, 1), (2, 10), (2, 0.01), (4, 1)):
+            binary = BytesIO()
+            encode_to_binary(binary, self.ticks, *parameters)
+            sizes[parameters] = len(binary.getvalue())
+        self.assertLess(len(file.getvalue()), min(sizes.values()) * 1.01)
+        self.assertLess(len(file.getvalue()), sizes[2, 0.01] * 0.6)
+
+    def test_one_pass_stream(self):
+        file = BytesIO()
+        write_adaptive(file, (_ for _ in self.ticks), block_size=1000)
+        self.assertEqual(self.ticks, list(decode_to_string(ShortReads(file.getvalue()))))
+
+    def test_random_values(self):
+        values = [str(choice([Decimal(randint(-10 ** 6, 10 ** 6)).scaleb(-randint(0, 4)), randint(-2 ** 40, 2 ** 40),
+                              0])) for _ in range(2000)]
+        values += [str(choice([0, 5, 2 ** 63 - 1, -2 ** 63 + 1])) for _ in range(100)]
+        file = BytesIO()
+        write_adaptive(file, values, block_size=50)
+        file.seek(0)
+        self.assertEqual([Decimal(_) for _ in values], list(decode(file)))
+
+    def test_truncated(self):
+        file = BytesIO()
+        write_adaptive(file, self.prices[:100])
+        for data in (file.getvalue()[:-1], file.getvalue()[:-10]):
+            with self.assertRaises(EOFError):
+                list(decode(BytesIO(data)))
+        with self.assertRaises(ValueError):
+            list(decode(BytesIO(b'RENC\x01\x00')))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+from unittest import TestCase, main
+from decimal import Decimal
+from io import BytesIO
+import os
+from compression_algorithms.append_encoding import AppendEncoder, read_state, append_file
+from compression_algorithms.adaptive_encoding import decode, decode_to_string
+
+
+class CountingBytesIO(BytesIO):
+    def __init__(self, *args):
+        BytesIO.__init__(self, *args)
+        self.read_bytes = 0
+
+    def read(self, *args):
+        data = BytesIO.read(self, *args)
+        self.read_bytes += len(data)
+        return data
+
+
+class TestAppendEncoding(TestCase):
+    def setUp(self):
+        self.prices = open('resources/prices.txt', 'r').read().split()
+
+    def encode_once(self, values, block_size):
+        file = BytesIO()
+        with AppendEncoder(file, block_size) as encoder:
+            encoder.append(values)
+        return file.getvalue()
+
+    def test_same_as_single_run(self):
+        file = BytesIO()
+        for start, stop in ((0, 10), (10, 10), (10, 1500), (1500, 1501), (1501, 4000), (4000, len(self.prices))):
+            with AppendEncoder(file, 1000) as encoder:
+                encoder.append(self.prices[start:stop])
+        self.assertEqual(self.encode_once(self.prices, 1000), file.getvalue())
+        file.seek(0)
+        self.assertEqual([Decimal(_) for _ in self.prices], list(decode(file)))
+
+    def test_scale_change(self):
+        # the open block is carried over as text and keeps the places it was written with
+        values = ['10', '11', '12.5', '13', '13.25', '14']
+        file = BytesIO()
+        for value in values:
+            with AppendEncoder(file, 4) as encoder:
+                encoder.append([value])
+        self.assertEqual(self.encode_once(values, 4), file.getvalue())
+        self.assertEqual(['10.0', '11.0', '12.5', '13.0', '13.25', '14.00'], list(decode_to_string(BytesIO(file.getvalue()))))
+
+    def test_state(self):
+        file = BytesIO()
+        with AppendEncoder(file, 1000) as encoder:
+            encoder.append(self.prices[:2500])
+        state = read_state(file)
+        self.assertEqual(2500, state.count)
+        self.assertEqual(1000, state.block_size)
+        self.assertEqual(int(Decimal(self.prices[2499]).scaleb(state.exponent)), state.last_value)
+
+    def test_resume_reads_open_block_only(self):
+        file = CountingBytesIO()
+        with AppendEncoder(file, 100) as encoder:
+            encoder.append(self.prices)
+        file.read_bytes = 0
+        with AppendEncoder(file) as encoder:
+            encoder.append(['1.5'])
+        self.assertLess(file.read_bytes, 200)
+        self.assertEqual(len(self.prices) + 1, read_state(file).count)
+
+    def test_errors(self):
+        file = BytesIO()
+        with AppendEncoder(file, 10) as encoder:
+            encoder.append(self.prices[:25])
+        with self.assertRaises(ValueError):
+            AppendEncoder(file, 20)
+        with self.assertRaises(ValueError):
+            AppendEncoder(BytesIO(file.getvalue()[:-1]))
+
+    def test_append_file(self):
+        path = 'output/prices.rapt'
+        if os.path.exists(path):
+            os.remove(path)
+        try:
+            self.assertEqual(5000, append_file(path, self.prices[:5000]))
+            self.assertEqual(len(self.prices), append_file(path, self.prices[5000:]))
+            with open(path, 'rb') as file:
+                self.assertEqual(self.encode_once(self.prices, None), file.read())
+        finally:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
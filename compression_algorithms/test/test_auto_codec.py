@@ -0,0 +1,54 @@
+from unittest import TestCase, main
+from io import BytesIO
+from random import Random
+from compression_algorithms.auto_codec import CODECS, CODEC_IDS, sample, trial_sizes, encode, decode, read_blocks
+from compression_algorithms.benchmark import synthetic_ticks
+from compression_algorithms.pipeline import encode as encode_pipeline
+
+
+class TestAutoCodec(TestCase):
+    def setUp(self):
+        random = Random(1)
+        self.flat = ['101.25'] * 4096
+        self.trend = list(synthetic_ticks(4096, seed=2))
+        self.noise = [''.join(random.choice('abcdefghij0123456789') for _ in range(8)) for _ in range(4096)]
+
+    def test_sample(self):
+        block = list(range(4096))
+        picked = sample(block, 512, 4)
+        self.assertEqual(512, len(picked))
+        self.assertEqual(list(range(128)), picked[:128])
+        self.assertEqual(block[:100], sample(block[:100], 512, 4))
+
+    def test_regimes(self):
+        data = self.flat + self.trend + self.noise + self.flat
+        encoded = b''.join(encode(data))
+        codecs = [CODECS[codec_id].name for codec_id, _, _ in read_blocks(BytesIO(encoded))]
+        self.assertEqual(['rle', 'delta+rle+huffman', 'plain', 'rle'], codecs)
+        self.assertEqual(data, list(decode(BytesIO(encoded))))
+        for codec in CODECS:
+            if codec.exact:
+                self.assertLess(len(encoded), len(b''.join(encode_pipeline(data, codec.declared, 4096))), codec.name)
+
+    def test_inexact_codecs_are_checked(self):
+        # decimal text that the delta codecs would give back as '1.50' and '2.00'
+        data = ['1.5', '2', '1.25'] * 2000
+        encoded = b''.join(encode(data))
+        self.assertEqual(data, list(decode(BytesIO(encoded))))
+
+    def test_codec_subset_and_budget(self):
+        encoded = b''.join(encode(self.trend, codecs=['plain', 'rle']))
+        self.assertEqual({CODEC_IDS['rle']}, {_[0] for _ in read_blocks(BytesIO(encoded))})
+        # without any time, only the first codec is tried
+        self.assertEqual([0], list(trial_sizes(self.trend, range(len(CODECS)), 0)))
+        self.assertEqual(self.trend, list(decode(BytesIO(b''.join(encode(self.trend, time_budget=0))))))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            list(decode(BytesIO(b'AUTO\x01\x7f\x01\x00')))
+        with self.assertRaises(EOFError):
+            list(decode(BytesIO(b''.join(encode(self.flat))[:-1])))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+from unittest import TestCase, main
+from compression_algorithms.benchmark import codecs, synthetic_ticks, run_benchmarks, format_results
+
+
+class TestBenchmark(TestCase):
+    def test_run_benchmarks(self):
+        datasets = {'synthetic_ticks': list(synthetic_ticks(2000)), 'symbols': ['F'] * 2000}
+        results = run_benchmarks(datasets, ['relative_encoding[tf=2,tol=1]', 'zlib[6]'], repeat=1)
+        self.assertEqual([('synthetic_ticks', 'relative_encoding[tf=2,tol=1]'), ('synthetic_ticks', 'zlib[6]'),
+                          ('symbols', 'zlib[6]')], [(_['dataset'], _['codec']) for _ in results])
+        for result in results:
+            self.assertEqual(2000, result['decoded_values'])
+            self.assertGreater(result['ratio'], 1)
+            self.assertGreater(result['encode_peak_bytes'], 0)
+        self.assertEqual(len(results) + 1, len(format_results(results).splitlines()))
+
+    def test_codecs_round_trip(self):
+        values = list(synthetic_ticks(500))
+        for name, codec in codecs.items():
+            self.assertEqual(len(values), len(codec.decode(codec.encode(values))), name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+from unittest import TestCase, main
+from decimal import Decimal
+from io import BytesIO
+from random import choice, randint
+import numpy as np
+from compression_algorithms.bit_packing import pack_bits, unpack_bits, choose_width, bit_lengths, pack, unpack, \
+    pack_relative, unpack_relative
+from compression_algorithms.relative_encoding_binary import encode_to_binary
+
+
+class TestBitPacking(TestCase):
+    def setUp(self):
+        self.prices = open('resources/prices.txt', 'r').read().split()
+
+    def test_bits(self):
+        values = np.array([0, 1, 5, 7, 2], dtype=np.uint64)
+        packed = pack_bits(values, 3)
+        self.assertEqual(2, len(packed))
+        self.assertEqual(values.tolist(), unpack_bits(packed, 5, 3).tolist())
+        self.assertEqual([0, 0], unpack_bits(b'', 2, 0).tolist())
+
+    def test_width(self):
+        self.assertEqual((3, 3), choose_width(bit_lengths(np.array([1, 5, 7, 2] * 32, dtype=np.uint64))))
+        # a single large outlier becomes an exception instead of widening the whole block
+        width, longest = choose_width(bit_lengths(np.array([1, 2, 3] * 40 + [10 ** 9], dtype=np.uint64)))
+        self.assertEqual((2, 30), (width, longest))
+
+    def test_round_trip(self):
+        for block_size in (1, 7, 128, 256):
+            values = np.array([choice([randint(-5, 5), randint(0, 1000), randint(-2 ** 63, 2 ** 63 - 1)])
+                               for _ in range(1000)], dtype=np.int64)
+            self.assertEqual(values.tolist(), unpack(pack(values, block_size)).tolist())
+        self.assertEqual([], unpack(pack([])).tolist())
+        with self.assertRaises(ValueError):
+            pack([1], 257)
+
+    def test_prices(self):
+        packed = pack_relative(self.prices, 2, 1)
+        binary = BytesIO()
+        encode_to_binary(binary, self.prices, 2, 1)
+        self.assertLess(len(packed), len(binary.getvalue()))
+        values, exponent = unpack_relative(packed)
+        self.assertEqual(2, exponent)
+        self.assertEqual([int(Decimal(_).scaleb(exponent)) for _ in self.prices], values.tolist())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+from unittest import TestCase, main
+from decimal import Decimal
+from io import BytesIO
+from random import choice, randint
+import numpy as np
+from compression_algorithms.buffer_codec import max_encoded_size, encode_into, decode_into
+from compression_algorithms.relative_encoding import to_fixed_point
+from compression_algorithms.relative_encoding_binary import encode_to_binary, decode_from_binary
+
+
+class TestBufferCodec(TestCase):
+    def setUp(self):
+        self.prices = open('resources/prices.txt', 'r').read().split()
+        self.values, self.exponent = to_fixed_point(self.prices)
+
+    def test_same_stream_as_binary(self):
+        output = bytearray(max_encoded_size(len(self.values)))
+        size = encode_into(self.values, output, self.exponent, 1, chunk_size=1000)
+        binary = BytesIO()
+        encode_to_binary(binary, self.prices, transform_factor=2, tolerance_factor=1)
+        self.assertEqual(binary.getvalue(), bytes(output[:size]))
+
+    def test_round_trip(self):
+        output = np.empty(max_encoded_size(len(self.values)), dtype=np.uint8)
+        size = encode_into(memoryview(self.values), output, self.exponent)
+        decoded = np.zeros(len(self.values) + 10, dtype=np.int64)
+        self.assertEqual(len(self.values), decode_into(memoryview(output)[:size], decoded, chunk_size=100))
+        self.assertEqual(self.values.tolist(), decoded[:len(self.values)].tolist())
+        self.assertEqual([Decimal(_) for _ in self.prices], list(decode_from_binary(BytesIO(output[:size]))))
+
+    def test_decode_binary_file(self):
+        binary = BytesIO()
+        encode_to_binary(binary, self.prices, transform_factor=2, tolerance_factor=0.1)
+        decoded = bytearray(8 * len(self.prices))
+        self.assertEqual(len(self.prices), decode_into(binary.getvalue(), decoded))
+        self.assertEqual(self.values.tolist(), np.frombuffer(decoded, dtype=np.int64).tolist())
+
+    def test_random_values(self):
+        for _ in range(100):
+            values = np.array([choice([randint(-10 ** 6, 10 ** 6), 0, randint(-2 ** 62, 2 ** 62)])
+                               for _ in range(randint(0, 300))], dtype=np.int64)
+            output = bytearray(max_encoded_size(len(values)))
+            size = encode_into(values.tobytes(), output, randint(0, 4), choice([0, 1, 100]), randint(1, 50))
+            decoded = np.zeros(len(values), dtype=np.int64)
+            self.assertEqual(len(values), decode_into(bytes(output[:size]), decoded, randint(25, 60)))
+            self.assertEqual(values.tolist(), decoded.tolist())
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            encode_into(self.values, bytearray(100), self.exponent)
+        with self.assertRaises(TypeError):
+            encode_into(self.values, bytes(max_encoded_size(len(self.values))), self.exponent)
+        output = bytearray(max_encoded_size(len(self.values)))
+        size = encode_into(self.values, output, self.exponent)
+        with self.assertRaises(ValueError):
+            decode_into(output[:size], np.zeros(10, dtype=np.int64))
+        with self.assertRaises(EOFError):
+            decode_into(output[:size - 1], np.zeros(len(self.values), dtype=np.int64))
+
+
+if __name__ == '__main__':
+    main()
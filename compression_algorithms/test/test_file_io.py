@@ -0,0 +1,74 @@
+from unittest import TestCase, main
+from io import BytesIO
+import csv
+from os import remove
+import compression_algorithms
+from compression_algorithms.file_io import CompressedWriter, CompressedReader
+
+INPUT = '../../practice_problems/trade_analyzer/input.csv'
+
+
+class TestFileIo(TestCase):
+    def setUp(self):
+        with open('resources/prices.txt', 'rb') as file:
+            self.raw = file.read()
+
+    def write(self, data, codec='lz77', block_size=1 << 14, pieces=1000):
+        file = BytesIO()
+        with compression_algorithms.open(file, 'wb', codec=codec, block_size=block_size) as writer:
+            for start in range(0, len(data), pieces):
+                self.assertEqual(len(data[start:start + pieces]), writer.write(data[start:start + pieces]))
+        return file.getvalue()
+
+    def test_exact_bytes(self):
+        for data in (self.raw, self.raw[:-1], b'', b'no newline', b'\n\n'):
+            for codec in ('lz77', 'symbols'):
+                encoded = self.write(data, codec)
+                self.assertEqual(data, compression_algorithms.open(BytesIO(encoded)).read())
+        self.assertLess(len(self.write(self.raw, 'prices')), len(self.raw) / 4)
+
+    def test_reads(self):
+        reader = compression_algorithms.open(BytesIO(self.write(self.raw)))
+        self.assertEqual(self.raw[:10], reader.read(10))
+        self.assertEqual(self.raw[10:11], reader.peek()[:1])
+        buffer = bytearray(20000)
+        self.assertEqual(20000, reader.readinto(buffer))
+        self.assertEqual(self.raw[10:20010], bytes(buffer))
+        line = reader.readline()
+        self.assertEqual(self.raw[20010:20010 + len(line)], line)
+        self.assertTrue(line.endswith(b'\n'))
+        self.assertEqual(self.raw[20010 + len(line):], reader.read())
+        self.assertEqual(b'', reader.read())
+        self.assertEqual(0, reader.readinto(buffer))
+
+    def test_lines(self):
+        lines = list(compression_algorithms.open(BytesIO(self.write(self.raw)), 'rt'))
+        self.assertEqual(self.raw.decode('utf-8').splitlines(True), lines)
+        reader = compression_algorithms.open(BytesIO(self.write(b'abcdef\ngh')))
+        self.assertEqual(b'abc', reader.readline(3))
+        self.assertEqual(b'def\n', reader.readline())
+        self.assertEqual([b'gh'], list(reader))
+
+    def test_trades(self):
+        path = 'output/input.caio'
+        try:
+            with open(INPUT, newline='') as source, compression_algorithms.open(path, 'wt', codec='trades') as file:
+                file.writelines(source)
+            with open(INPUT, newline='') as source, compression_algorithms.open(path, 'rt') as file:
+                self.assertEqual(list(csv.reader(source)), list(csv.reader(file)))
+        finally:
+            remove(path)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            compression_algorithms.open(BytesIO(), 'ab')
+        with self.assertRaises(ValueError):
+            CompressedReader(BytesIO(b'RENC\x01'))
+        writer = CompressedWriter(BytesIO())
+        writer.close()
+        with self.assertRaises(ValueError):
+            writer.write(b'x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+from unittest import TestCase, main
+from io import BytesIO
+from random import choice, randint
+from compression_algorithms.huffman_encoding import code_lengths, build_table, canonical_codes, serialize_table, \
+    deserialize_table, encode, decode, encode_to_bytes, decode_from_bytes
+from compression_algorithms.relative_encoding import encode_to_string
+from compression_algorithms import run_length_enconding
+
+
+class TestHuffmanEncoding(TestCase):
+    def setUp(self):
+        self.values = bytes(randint(0, randint(0, 255)) for _ in range(randint(1, 2000)))
+
+    def test_encode_decode_bytes(self):
+        for _ in range(10):
+            self.setUp()
+            self.assertEqual(self.values, bytes(decode_from_bytes(encode_to_bytes(self.values))))
+
+    def test_encode_decode_tokens(self):
+        tokens = list(run_length_enconding.encode_to_string(
+            encode_to_string(open('resources/prices.txt', 'r'), transform_factor=2, tolerance_factor=1)))
+        encoded = encode_to_bytes(tokens)
+        self.assertLess(len(encoded), len(','.join(tokens)) / 4)
+        self.assertEqual(tokens, list(decode_from_bytes(BytesIO(encoded))))
+
+    def test_length_limit(self):
+        weights = [1, 1]
+        while len(weights) < 30:
+            weights.append(weights[-1] + weights[-2])
+        for max_length in (5, 8, 15):
+            lengths = code_lengths(dict(enumerate(weights)), max_length)
+            self.assertEqual(max_length, max(lengths.values()))
+            self.assertEqual(1, sum(2 ** -_ for _ in lengths.values()))
+            symbols = [choice(range(30)) for _ in range(1000)]
+            self.assertEqual(symbols, list(decode(encode(symbols, lengths), lengths, len(symbols))))
+
+    def test_canonical_codes(self):
+        codes = canonical_codes({'a': 2, 'b': 1, 'c': 3, 'd': 3})
+        self.assertEqual({'b': (0b0, 1), 'a': (0b10, 2), 'c': (0b110, 3), 'd': (0b111, 3)}, codes)
+
+    def test_table_round_trip(self):
+        for symbols in (self.values, ['146.61A', '(0,8)', '-1', '1', '1', 'ü']):
+            lengths = build_table(symbols)
+            self.assertEqual(lengths, deserialize_table(BytesIO(serialize_table(lengths))))
+
+    def test_single_symbol(self):
+        self.assertEqual(b'aaaa', bytes(decode_from_bytes(encode_to_bytes(b'aaaa'))))
+        self.assertEqual(b'', bytes(decode_from_bytes(encode_to_bytes(b''))))
+
+    def test_streaming_decode(self):
+        lengths = build_table(self.values)
+        encoded = b''.join(encode(self.values, lengths))
+        chunks = (encoded[_:_ + 1] for _ in range(len(encoded)))
+        self.assertEqual(self.values, bytes(decode(chunks, lengths, len(self.values))))
+
+    def test_truncated(self):
+        encoded = encode_to_bytes(b'abcdefgh' * 10)
+        with self.assertRaises(EOFError):
+            list(decode_from_bytes(encoded[:-1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+from unittest import TestCase, main
+from decimal import Decimal
+from io import BytesIO
+from random import randrange
+from compression_algorithms.indexed_file import write_indexed, read_index, read_range, read_value
+
+
+class CountingBytesIO(BytesIO):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.seeks = []
+
+    def seek(self, *args):
+        self.seeks.append(args)
+        return super().seek(*args)
+
+
+class TestIndexedFile(TestCase):
+    def setUp(self):
+        self.prices = [Decimal(_) for _ in open('resources/prices.txt', 'r')]
+        self.file = CountingBytesIO()
+        write_indexed(self.file, (str(_) for _ in self.prices), block_size=1000)
+
+    def test_index(self):
+        index = read_index(self.file)
+        self.assertEqual(len(self.prices), index.count)
+        self.assertEqual(list(range(0, len(self.prices), 1000)), index.ordinals)
+
+    def test_read_range(self):
+        index = read_index(self.file)
+        for _ in range(20):
+            start = randrange(len(self.prices))
+            stop = start + randrange(3000)
+            self.assertEqual(self.prices[start:stop], [Decimal(_) for _ in read_range(self.file, start, stop, index)])
+        self.assertEqual(self.prices[-5:], [Decimal(_) for _ in read_range(self.file, -5, None, index)])
+        self.assertEqual([], read_range(self.file, 10, 10, index))
+
+    def test_read_value_decodes_one_block(self):
+        index = read_index(self.file)
+        self.file.seeks.clear()
+        self.assertEqual(self.prices[12345], Decimal(read_value(self.file, 12345, index)))
+        self.assertEqual([(index.offsets[12],)], self.file.seeks)
+        with self.assertRaises(IndexError):
+            read_value(self.file, len(self.prices), index)
+
+
+if __name__ == '__main__':
+    main()
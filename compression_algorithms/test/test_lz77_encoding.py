@@ -0,0 +1,68 @@
+from unittest import TestCase, main
+from io import BytesIO
+from random import choice, randint
+from compression_algorithms.lz77_encoding import LEVELS, common_length, find_matches, compress, decompress, \
+    encode_tokens, decode_tokens
+from compression_algorithms.pipeline import encode, decode
+
+
+class TestLz77Encoding(TestCase):
+    def setUp(self):
+        self.raw = open('resources/prices.txt', 'rb').read()
+        # oscillating deltas and recurring runs as they come out of the delta and rle stages
+        self.tokens = ['90.5A', '1', '-1', '(0,8)', '2', '-2', '(0,8)', '1', '-1', '3'] * 300
+
+    def test_common_length(self):
+        sequence = b'abcabcabcx'
+        self.assertEqual(6, common_length(sequence, 0, 3, 7))
+        self.assertEqual(4, common_length(sequence, 0, 3, 4))
+        self.assertEqual(0, common_length(sequence, 0, 1, 9))
+
+    def test_matches(self):
+        self.assertEqual([(0, 3, 3, 6), (9, 10, 0, 0)], list(find_matches(b'abcabcabcx')))
+        # the window keeps matches close, distance 3 is too far for a window of 2
+        self.assertEqual([(0, 10, 0, 0)], list(find_matches(b'abcabcabcx', window=2)))
+
+    def test_lazy_matching(self):
+        # at position 12 the greedy match 'bcd' hides the longer 'cdefg' one step later
+        sequence = b'bcdxxcdefgyybcdefg'
+        self.assertEqual((0, 12, 12, 3), next(find_matches(sequence, level='fast')))
+        self.assertEqual([(0, 13, 8, 5)], list(find_matches(sequence, level='best')))
+        self.assertEqual(sequence, decompress(compress(sequence, level='best')))
+
+    def test_bytes(self):
+        for level in LEVELS:
+            compressed = compress(self.raw, level=level)
+            self.assertLess(len(compressed), len(self.raw) / 4)
+            self.assertEqual(self.raw, decompress(compressed))
+        self.assertLess(len(compress(self.raw, level='best')), len(compress(self.raw, level='fast')))
+        self.assertEqual(b'', decompress(compress(b'')))
+
+    def test_random_bytes(self):
+        for _ in range(200):
+            data = bytes(choice(b'ab') for _ in range(randint(0, 300)))
+            for level in LEVELS:
+                self.assertEqual(data, decompress(compress(data, window=randint(1, 100), level=level)))
+
+    def test_tokens(self):
+        encoded = list(encode_tokens(self.tokens, level='best'))
+        self.assertLess(len(encoded), len(self.tokens) / 50)
+        self.assertEqual(self.tokens, decode_tokens(encoded))
+        tokens = [choice(['a', '@b', '@@', '@', '1', '2']) for _ in range(2000)]
+        self.assertEqual(tokens, decode_tokens(encode_tokens(tokens, min_match=2)))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            decode_tokens(['a', '@', '3', '2'])
+        with self.assertRaises(EOFError):
+            decompress(compress(self.raw)[:-5])
+
+    def test_pipeline_stage(self):
+        declared = [('lz77', {'level': 'best'}), ('huffman', {})]
+        file = BytesIO(b''.join(encode(self.tokens, declared)))
+        self.assertLess(len(file.getvalue()), len(b''.join(encode(self.tokens, [('huffman', {})]))) / 8)
+        self.assertEqual(self.tokens, list(decode(file)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+from unittest import TestCase, main
+from decimal import Decimal
+from os import remove
+import numpy as np
+from compression_algorithms.relative_encoding import encode_to_string, decode_from_string
+from compression_algorithms.mmap_decoding import decode_mmap, decode_mmap_into, count_tokens
+
+
+class TestMmapDecoding(TestCase):
+    def setUp(self):
+        self.encoded = list(encode_to_string(open('resources/prices.txt', 'r'), transform_factor=2,
+                                             tolerance_factor=1))
+        self.expected = list(decode_from_string(self.encoded, transform_factor=2))
+        with open('output/prices_mmap.txt', 'w') as file:
+            file.write(','.join(self.encoded))
+
+    def tearDown(self):
+        remove('output/prices_mmap.txt')
+
+    def test_decode_mmap(self):
+        for chunk_size in (7, 1000, 1 << 20):
+            self.assertEqual(self.expected, list(decode_mmap('output/prices_mmap.txt', transform_factor=2,
+                                                             chunk_size=chunk_size)))
+
+    def test_decode_mmap_into(self):
+        count = count_tokens('output/prices_mmap.txt', chunk_size=1000)
+        self.assertEqual(len(self.encoded), count)
+        out = np.empty(count, dtype=np.int64)
+        self.assertEqual(count, decode_mmap_into('output/prices_mmap.txt', out, transform_factor=2, chunk_size=1000))
+        self.assertEqual([int(_.scaleb(2)) for _ in self.expected], out.tolist())
+        with self.assertRaises(ValueError):
+            decode_mmap_into('output/prices_mmap.txt', np.empty(count - 1, dtype=np.int64), transform_factor=2)
+
+    def test_separators_and_exponent(self):
+        with open('output/prices_mmap.txt', 'w') as file:
+            file.write('1.5A\n10,-5\n\n-0.25A,1\n')
+        self.assertEqual([Decimal('1.5'), Decimal('1.6'), Decimal('1.55'), Decimal('-0.25'), Decimal('-0.24')],
+                         list(decode_mmap('output/prices_mmap.txt', transform_factor=2, exponent=3, chunk_size=4)))
+
+    def test_invalid_token(self):
+        with open('output/prices_mmap.txt', 'w') as file:
+            file.write('1.5A,1x')
+        with self.assertRaises(ValueError):
+            list(decode_mmap('output/prices_mmap.txt'))
+
+    def test_empty_file(self):
+        open('output/prices_mmap.txt', 'w').close()
+        self.assertEqual([], list(decode_mmap('output/prices_mmap.txt')))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+from unittest import TestCase, main
+from io import BytesIO
+from compression_algorithms import pipeline
+from compression_algorithms.parallel import encode, decode
+
+STAGES = [('delta', {'transform_factor': 2, 'tolerance_factor': 1}), ('rle', {}), ('huffman', {})]
+
+
+class TestParallel(TestCase):
+    def setUp(self):
+        self.prices = [_.strip() for _ in open('resources/prices.txt', 'r')]
+
+    def test_identical_to_serial(self):
+        serial = b''.join(pipeline.encode(self.prices, STAGES, block_size=1000))
+        for workers, in_flight in ((1, 1), (2, None), (3, 5)):
+            self.assertEqual(serial, b''.join(encode(self.prices, STAGES, 1000, workers, in_flight)))
+
+    def test_decode(self):
+        file = BytesIO(b''.join(pipeline.encode(self.prices, STAGES, block_size=1000)))
+        expected = list(pipeline.decode(file))
+        file.seek(0)
+        self.assertEqual(expected, list(decode(file, workers=2)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+from unittest import TestCase, main
+from decimal import Decimal
+from io import BytesIO
+from os import remove
+from compression_algorithms.pipeline import encode, decode, encode_file, decode_file, read_frame
+
+PRICE_STAGES = [('delta', {'transform_factor': 2, 'tolerance_factor': 1}), ('rle', {'repeats_trigger': 3}),
+                ('huffman', {})]
+SYMBOL_STAGES = [('rle', {}), ('huffman', {'max_length': 12})]
+
+
+class TestPipeline(TestCase):
+    def setUp(self):
+        self.prices = [_.strip() for _ in open('resources/prices.txt', 'r')]
+
+    def test_encode_decode_prices(self):
+        file = BytesIO(b''.join(encode(self.prices, PRICE_STAGES, block_size=1000)))
+        self.assertLess(len(file.getvalue()), len(''.join(self.prices)) / 4)
+        self.assertEqual([Decimal(_) for _ in self.prices], [Decimal(_) for _ in decode(file)])
+
+    def test_frames(self):
+        frames = list(encode(self.prices, PRICE_STAGES, block_size=5000))
+        self.assertEqual(4, len(frames))
+        declared, count, _ = read_frame(BytesIO(frames[-1]))
+        self.assertEqual(PRICE_STAGES, [tuple(_) for _ in declared])
+        self.assertEqual(len(self.prices) - 15000, count)
+
+    def test_text_payload(self):
+        values = ['a', 'a', 'a', 'b', 'c', 'c']
+        for declared in ([], [('rle', {})]):
+            file = BytesIO(b''.join(encode(values, declared, block_size=4)))
+            self.assertEqual(values, list(decode(file)))
+
+    def test_long_list(self):
+        encode_file('resources/long_list.txt', 'output/long_list.pfrm', SYMBOL_STAGES)
+        decode_file('output/long_list.pfrm', 'output/long_list.txt')
+        self.assertEqual(open('resources/long_list.txt', 'r').read().splitlines(),
+                         open('output/long_list.txt', 'r').read().splitlines())
+        remove('output/long_list.pfrm')
+        remove('output/long_list.txt')
+
+    def test_unknown_stage(self):
+        with self.assertRaises(ValueError):
+            list(encode(self.prices, [('missing', {})]))
+        with self.assertRaises(ValueError):
+            list(encode(self.prices, [('huffman', {}), ('rle', {})]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+from unittest import TestCase, main
+from decimal import Decimal
+from io import BytesIO
+from random import Random, choice, randint
+from compression_algorithms.rans_encoding import AdaptiveModel, TOTAL, CONTEXTS, encode, decode, encode_tokens, \
+    decode_tokens, encode_values, decode_values
+from compression_algorithms.relative_encoding import encode_to_string
+from compression_algorithms.pipeline import encode as encode_pipeline, decode as decode_pipeline
+
+
+def shifting_prices(count=60000, seed=5):
+    # calm and volatile stretches take turns every 10000 ticks
+    random = Random(seed)
+    price = 10000
+    for index in range(count):
+        price = max(price + random.randint(*((-1, 1) if index // 10000 % 2 == 0 else (-40, 40))), 1)
+        yield '%d.%02d' % divmod(price, 100)
+
+
+class TestRansEncoding(TestCase):
+    def setUp(self):
+        self.prices = open('resources/prices.txt', 'r').read().split()
+
+    def test_model(self):
+        model = AdaptiveModel()
+        for context in range(CONTEXTS):
+            self.assertEqual(TOTAL, sum(model.frequencies[context]))
+            self.assertEqual(TOTAL, len(model.slots[context]))
+        for _ in range(100):
+            model.update(0, 63)
+        self.assertGreater(model.frequencies[0][63], TOTAL / 4)
+        self.assertEqual(TOTAL, sum(model.frequencies[0]))
+        self.assertTrue(all(model.frequencies[0]))
+
+    def test_tokens_round_trip(self):
+        tokens = [(Decimal('146.61'), True), (1, False), (-1, False), (0, False), (64, False), (-1000000, False),
+                  (Decimal('-0.5'), True), (Decimal('1E+3'), True), (63, False), (-63, False)]
+        self.assertEqual(tokens, list(decode(encode(tokens))))
+        self.assertEqual([], list(decode(encode([]))))
+        for _ in range(50):
+            tokens = [choice([(randint(-100, 100), False), (Decimal(randint(-999, 999)).scaleb(-2), True),
+                              (0, False)]) for _ in range(randint(1, 500))]
+            self.assertEqual(tokens, list(decode(encode(tokens))))
+
+    def test_prices(self):
+        encoded = encode_values(self.prices, 2, 1)
+        self.assertLess(len(encoded), len(self.prices) / 2)
+        self.assertEqual([Decimal(_) for _ in self.prices], list(decode_values(encoded)))
+
+    def test_string_tokens(self):
+        tokens = list(encode_to_string(self.prices, transform_factor=2, tolerance_factor=1))
+        self.assertEqual(tokens, decode_tokens(encode_tokens(tokens)))
+
+    def test_adapts_to_shifts(self):
+        prices = list(shifting_prices())
+        delta = ('delta', {'transform_factor': 2, 'tolerance_factor': 1})
+        rans = b''.join(encode_pipeline(prices, [delta, ('rans', {})], block_size=len(prices)))
+        huffman = b''.join(encode_pipeline(prices, [delta, ('huffman', {})], block_size=len(prices)))
+        self.assertLess(len(rans), len(huffman) * 0.9)
+        self.assertEqual([Decimal(_) for _ in prices], [Decimal(_) for _ in decode_pipeline(BytesIO(rans))])
+
+    def test_truncated(self):
+        encoded = encode_values(self.prices[:1000], 2, 1)
+        with self.assertRaises(EOFError):
+            list(decode_values(encoded[:-20]))
+
+
+if __name__ == '__main__':
+    main()
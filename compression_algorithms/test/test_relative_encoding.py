@@ -2,7 +2,8 @@ from unittest import TestCase, main
 from decimal import Decimal
 from itertools import chain
 from random import choice, randint
-from compression_algorithms.relative_encoding import max_exponent, encode_to_string, decode_from_string
+from compression_algorithms.relative_encoding import max_exponent, encode_to_string, decode_from_string, \
+    encode_array, decode_array, encode_array_to_string, decode_array_from_string
 
 
 class TestRelativeEncoding(TestCase):
@@ -48,6 +49,47 @@ class TestRelativeEncoding(TestCase):
         f.write(','.join(
             encode_to_string((_ for _ in open('resources/prices.txt', 'r')), transform_factor=2, tolerance_factor=1)))
 
+    def test_array_encoding_matches_generators(self):
+        for _ in range(20):
+            exponent = max_exponent(self.decimals)
+            expected = list(encode_to_string(self.decimals, tolerance_factor=0.5, transform_factor=exponent))
+            encoded = encode_array_to_string(self.decimals, tolerance_factor=0.5, transform_factor=exponent)
+            self.assertEqual(expected, encoded)
+            self.assertEqual(self.decimals_decoded, decode_array_from_string(encoded, transform_factor=exponent))
+            self.setUp()
+
+    def test_array_encoding_prices(self):
+        prices = open('resources/prices.txt', 'r').readlines()
+        for transform_factor, tolerance_factor in ((2, 1), (2, 0.05), (1, 1), (0, 1)):
+            expected = list(encode_to_string(prices, transform_factor=transform_factor,
+                                             tolerance_factor=tolerance_factor))
+            encoded = encode_array_to_string(prices, transform_factor=transform_factor,
+                                             tolerance_factor=tolerance_factor)
+            self.assertEqual(expected, encoded)
+            self.assertEqual([str(_) for _ in decode_from_string(expected, transform_factor=transform_factor)],
+                             decode_array_from_string(encoded, transform_factor=transform_factor))
+
+    def test_array_round_trip(self):
+        encoded, absolute, exponent = encode_array(self.decimals, tolerance_factor=0.5, transform_factor=3)
+        self.assertEqual(max_exponent(self.decimals), exponent)
+        decoded = decode_array(encoded, absolute, exponent, transform_factor=3)
+        self.assertEqual([int(Decimal(_).scaleb(exponent)) for _ in self.decimals], decoded.tolist())
+
+    def test_array_encoding_exact(self):
+        for values, transform_factor in ((['12345678901.123456', '12345678901.123457'], 6),
+                                         (['92233720368547.76', '92233720368547.77'], 2),
+                                         (['-0.5', '+1.5', '.25', '3.', '1E+2', '100'], 2)):
+            self.assertEqual(list(encode_to_string(values, transform_factor=transform_factor)),
+                             encode_array_to_string(values, transform_factor=transform_factor))
+
+    def test_array_encoding_errors(self):
+        with self.assertRaises(OverflowError):
+            encode_array(['92233720368547758.08'])
+        with self.assertRaises(ValueError):
+            encode_array(['1.25'], exponent=1)
+        with self.assertRaises(TypeError):
+            encode_array([1.5, 1.6], transform_factor=1)
+
 
 def write_output_file(output_file, values):
     with open(output_file, mode='w') as file:
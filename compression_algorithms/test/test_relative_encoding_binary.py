@@ -0,0 +1,114 @@
+from unittest import TestCase, main
+from decimal import Decimal
+from io import BytesIO
+from compression_algorithms.relative_encoding import encode_to_string, decode_from_string
+from compression_algorithms.relative_encoding_binary import Header, write_binary, read_header, read_binary, \
+    encode_to_binary, decode_from_binary
+from compression_algorithms.varint import zigzag_encode, zigzag_decode, append_varint, zigzag_encode_array, \
+    zigzag_decode_array, varint_lengths, pack_varints, unpack_varints
+import numpy as np
+
+
+class NonSeekableBytesIO(BytesIO):
+    def seekable(self):
+        return False
+
+
+class TestRelativeEncodingBinary(TestCase):
+    def setUp(self):
+        self.prices = [_.strip() for _ in open('resources/prices.txt', 'r')]
+        self.encoded = list(encode_to_string(self.prices, transform_factor=2, tolerance_factor=1))
+        self.decoded = [str(_) for _ in decode_from_string(self.encoded, transform_factor=2)]
+
+    def test_encode_decode_prices(self):
+        file = BytesIO()
+        count = encode_to_binary(file, self.prices, transform_factor=2, tolerance_factor=1)
+        self.assertEqual(len(self.prices), count)
+        file.seek(0)
+        self.assertEqual(self.decoded, [str(_) for _ in decode_from_binary(file)])
+
+    def test_smaller_than_text(self):
+        file = BytesIO()
+        encode_to_binary(file, self.prices, transform_factor=2, tolerance_factor=1)
+        self.assertLess(len(file.getvalue()), len(','.join(self.encoded)) / 2)
+
+    def test_header(self):
+        file = BytesIO()
+        encode_to_binary(file, self.prices, transform_factor=2, tolerance_factor=0.5)
+        file.seek(0)
+        self.assertEqual(Header(2, 0.5, len(self.prices)), read_header(file))
+
+    def test_tokens_round_trip(self):
+        encoded = [('146.61', True), (1, False), (-1, False), (0, False), ('-0.5', True), (1000000, False),
+                   ('1E+3', True), (-64, False), (63, False)]
+        file = BytesIO()
+        write_binary(file, encoded, transform_factor=2)
+        file.seek(0)
+        header = read_header(file)
+        self.assertEqual([(Decimal(v) if f else v, f) for v, f in encoded], list(read_binary(file, header)))
+
+    def test_non_seekable(self):
+        file = NonSeekableBytesIO()
+        encode_to_binary(file, self.prices[:100], transform_factor=2)
+        file = BytesIO(file.getvalue())
+        self.assertEqual(None, read_header(file).count)
+        file.seek(0)
+        self.assertEqual(self.decoded[:100], [str(_) for _ in decode_from_binary(file)])
+
+    def test_embedded_stream(self):
+        file = BytesIO()
+        file.write(b'prefix')
+        write_binary(file, [('146.61', True), (1, False), (-300, False)], transform_factor=2)
+        end = file.tell()
+        file.write(b'suffix')
+        for stream in (file, NonSeekableBytesIO(file.getvalue())):
+            stream.seek(6) if stream is file else stream.read(6)
+            self.assertEqual([Decimal('146.61'), Decimal('146.62'), Decimal('143.62')],
+                             list(decode_from_binary(stream)))
+            self.assertEqual(b'suffix', stream.read())
+        file.seek(6)
+        list(decode_from_binary(file))
+        self.assertEqual(end, file.tell())
+
+    def test_truncated(self):
+        file = BytesIO()
+        write_binary(file, [('146.61', True)])
+        file = BytesIO(file.getvalue()[:-1])
+        header = read_header(file)
+        with self.assertRaises(EOFError):
+            list(read_binary(file, header))
+
+    def test_missing_tokens(self):
+        file = BytesIO()
+        write_binary(file, [('146.61', True), (1, False), (2, False)])
+        file = BytesIO(file.getvalue()[:-1])
+        header = read_header(file)
+        with self.assertRaises(EOFError):
+            list(read_binary(file, header))
+
+    def test_varints(self):
+        for value in (0, 1, -1, 63, -64, 64, 2 ** 40, -2 ** 40):
+            self.assertEqual(value, zigzag_decode(zigzag_encode(value)))
+        buffer = bytearray()
+        append_varint(buffer, 300)
+        self.assertEqual(b'\xac\x02', bytes(buffer))
+        with self.assertRaises(ValueError):
+            append_varint(buffer, -1)
+
+    def test_varint_arrays(self):
+        values = [0, 1, -1, 63, -64, 64, 2 ** 40, -2 ** 40, 2 ** 63 - 1, -2 ** 63]
+        zigzag = zigzag_encode_array(values)
+        self.assertEqual([zigzag_encode(_) for _ in values], zigzag.tolist())
+        self.assertEqual(values, zigzag_decode_array(zigzag).tolist())
+        buffer = bytearray()
+        for value in zigzag.tolist():
+            append_varint(buffer, value)
+        self.assertEqual(bytes(buffer), pack_varints(zigzag))
+        self.assertEqual(len(buffer), varint_lengths(zigzag).sum())
+        self.assertEqual(zigzag.tolist(), unpack_varints(bytes(buffer)).tolist())
+        with self.assertRaises(EOFError):
+            unpack_varints(b'\xac')
+
+
+if __name__ == '__main__':
+    main()
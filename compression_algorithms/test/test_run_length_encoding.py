@@ -33,6 +33,28 @@ class TestRunLengthEncoding(TestCase):
         self.assertEqual(line, ','.join(decode_from_string(expected)))
         self.assertEqual([str(_) for _ in self.values], list(decode_from_string(encode_to_string(self.values))))
 
+    def test_encode_array(self):
+        values, counts = encode_array(self.values)
+        self.assertEqual(list(encode(self.values)), to_groups(values, counts))
+        self.assertEqual(self.values, decode_array(values, counts).tolist())
+
+    def test_encode_bytes(self):
+        data = bytes(v for g in ([_] * randrange(1, 300) for _ in range(randrange(256))) for v in g)
+        values, counts = encode_bytes(data)
+        self.assertEqual([(v, n) for v, n in encode(data)], to_groups(values, counts))
+        self.assertEqual(data, decode_bytes(values, counts))
+
+    def test_encode_array_to_string(self):
+        line = '146.61A,1,-1,0,0,0,0,0,0,0,0,1,1,-1,0,0,0,0,0,1'
+        expected = ['146.61A', '1', '-1', '(0,8)', '1', '1', '-1', '(0,5)', '1']
+        self.assertEqual(expected, encode_array_to_string(line.split(','), repeats_trigger=3))
+        self.assertEqual(line.split(','), decode_array_from_string(expected))
+        for repeats_trigger in range(5):
+            self.assertEqual(list(encode_to_string(self.values, repeats_trigger)),
+                             encode_array_to_string(self.values, repeats_trigger))
+        tokens = ['(a,2)', '(a,b)', '(1,2,3)', '( 1, 2)', '(,3)', '()', '(']
+        self.assertEqual(list(decode_from_string(tokens)), decode_array_from_string(tokens))
+
     def assert_results(self, encoded):
         decoded = list(decode(encoded))
         print('Decoded result:', decoded)
@@ -0,0 +1,48 @@
+from unittest import TestCase, main
+from random import choice, randint, random
+from compression_algorithms.time_series import BitWriter, BitReader, encode_timestamps, decode_timestamps, \
+    encode_floats, decode_floats, encode_to_bytes, decode_from_bytes
+
+
+class TestTimeSeries(TestCase):
+    def setUp(self):
+        self.timestamps = [int(_.split(',')[0]) for _ in open('../../practice_problems/trade_analyzer/input.csv')]
+        self.prices = [float(_) for _ in open('resources/prices.txt', 'r')]
+
+    def test_bits(self):
+        writer = BitWriter()
+        for value, width in ((1, 1), (5, 3), (300, 9), (2 ** 64 - 1, 64), (0, 2)):
+            writer.write(value, width)
+        reader = BitReader(writer.flush())
+        self.assertEqual([1, 5, 300, 2 ** 64 - 1, 0], [reader.read(_) for _ in (1, 3, 9, 64, 2)])
+        with self.assertRaises(EOFError):
+            reader.read(8)
+
+    def test_timestamps(self):
+        encoded = encode_to_bytes(encode_timestamps, self.timestamps)
+        self.assertLess(len(encoded), len(self.timestamps) * 5)
+        self.assertEqual(self.timestamps, list(decode_from_bytes(decode_timestamps, encoded)))
+
+    def test_timestamp_buckets(self):
+        for difference in (63, 64, 65, -63, -64, 255, 256, 257, -256, 2048, 2049, -2048, 2 ** 31, 2 ** 31 + 1, 10 ** 12, -10 ** 12):
+            timestamps = [0, 1000, 2000 + difference, 3000 + difference]
+            self.assertEqual(timestamps, list(decode_timestamps(b''.join(encode_timestamps(timestamps)), 4)))
+
+    def test_regular_timestamps(self):
+        timestamps = list(range(10 ** 9, 10 ** 9 + 8000 * 1000, 1000))
+        self.assertLess(len(b''.join(encode_timestamps(timestamps))), 8000 / 8 + 20)
+
+    def test_floats(self):
+        encoded = encode_to_bytes(encode_floats, self.prices)
+        self.assertLess(len(encoded), len(self.prices) * 8 / 2)
+        self.assertEqual(self.prices, list(decode_from_bytes(decode_floats, encoded)))
+
+    def test_random_floats(self):
+        values = [choice([1.5, 1.25, -0.0, 0.0, float('inf'), 5e-324, random(), randint(-10, 10)])
+                  for _ in range(1000)]
+        decoded = list(decode_floats(encode_floats(values), len(values)))
+        self.assertEqual([repr(float(_)) for _ in values], [repr(_) for _ in decoded])
+
+
+if __name__ == '__main__':
+    main()
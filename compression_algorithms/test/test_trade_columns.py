@@ -0,0 +1,112 @@
+from unittest import TestCase, main
+from io import BytesIO, RawIOBase
+import csv
+import zlib
+from os import remove
+from decimal import Decimal
+from compression_algorithms.trade_columns import COLUMNS, TradeWriter, read_groups, read_rows, encode_csv, \
+    decode_csv, read_zone_maps
+
+INPUT = '../../practice_problems/trade_analyzer/input.csv'
+
+
+class CountingBytesIO(BytesIO):
+    def __init__(self, *args):
+        BytesIO.__init__(self, *args)
+        self.read_bytes = 0
+
+    def read(self, *args):
+        data = BytesIO.read(self, *args)
+        self.read_bytes += len(data)
+        return data
+
+
+class NonSeekable(RawIOBase):
+    def __init__(self, data):
+        self.data = BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        return self.data.read(size)
+
+
+class TestTradeColumns(TestCase):
+    def setUp(self):
+        with open(INPUT, newline='') as file:
+            self.rows = [(int(ts), symbol, int(quantity), price) for ts, symbol, quantity, price in csv.reader(file)]
+
+    def encode(self, rows, group_size=5000, symbol_stats=False):
+        file = BytesIO()
+        with TradeWriter(file, group_size, symbol_stats) as writer:
+            writer.write_rows(rows)
+        return file.getvalue()
+
+    def test_round_trip(self):
+        encoded = self.encode(self.rows)
+        self.assertEqual(self.rows, list(read_rows(BytesIO(encoded))))
+        with open(INPUT, 'rb') as file:
+            self.assertLess(len(encoded), len(zlib.compress(file.read(), 9)))
+
+    def test_groups(self):
+        groups = list(read_groups(BytesIO(self.encode(self.rows))))
+        self.assertEqual([5000] * 4 + [len(self.rows) - 20000], [len(_['timestamp']) for _ in groups])
+        self.assertEqual(set(COLUMNS + ('price_exponent',)), set(groups[0]))
+        self.assertEqual([_[1] for _ in self.rows[:5000]], groups[0]['symbol'].tolist())
+
+    def test_projection(self):
+        encoded = self.encode(self.rows)
+        file = CountingBytesIO(encoded)
+        quantities = [_ for group in read_groups(file, ('quantity',)) for _ in group['quantity'].tolist()]
+        self.assertEqual([_[2] for _ in self.rows], quantities)
+        self.assertLess(file.read_bytes, len(encoded) / 5)
+
+        groups = list(read_groups(NonSeekable(encoded), ('price',)))
+        self.assertEqual({'price', 'price_exponent'}, set(groups[0]))
+        self.assertEqual([int(_[3]) for _ in self.rows], [_ for group in groups for _ in group['price'].tolist()])
+        with self.assertRaises(ValueError):
+            next(read_groups(BytesIO(encoded), ('volume',)))
+
+    def test_decimal_prices(self):
+        rows = [(1000, 'abc', 10, '10.5'), (1000, 'xyz', 5, '7.25'), (1010, 'abc', 1, '10.75'),
+                (1500, 'abc', 3, '-1'), (1600, 'xyz', 2, '0')]
+        self.assertEqual([(1000, 'abc', 10, '10.50'), (1000, 'xyz', 5, '7.25'), (1010, 'abc', 1, '10.75'),
+                          (1500, 'abc', 3, '-1.00'), (1600, 'xyz', 2, '0.00')],
+                         list(read_rows(BytesIO(self.encode(rows)))))
+        self.assertEqual([], list(read_rows(BytesIO(self.encode([])))))
+
+    def test_zone_maps(self):
+        rows = [(1000, 'abc', 10, '10.5'), (990, 'xyz', 5, '7.25'), (1010, 'abc', 1, '10.75'),
+                (1500, 'abc', 3, '-1'), (1600, 'xyz', 2, '0')]
+        first, second = read_zone_maps(BytesIO(self.encode(rows, 3, True)))
+        self.assertEqual((3, 990, 1010), (first.count, first.min_timestamp, first.max_timestamp))
+        self.assertEqual((3, Decimal('7.25'), Decimal('10.75'), Decimal('10.5'), Decimal('10.75'), Decimal('28.5'), 16,
+                          Decimal('152')), tuple(first.total))
+        self.assertEqual({'abc', 'xyz'}, set(first.symbols))
+        self.assertEqual((2, Decimal('10.5'), Decimal('10.75'), 11), (first.symbols['abc'].count,
+                         first.symbols['abc'].min_price, first.symbols['abc'].max_price, first.symbols['abc'].volume))
+        self.assertEqual((2, Decimal('-1'), Decimal('0'), Decimal('-3')), (second.count, second.total.min_price,
+                         second.total.max_price, second.total.notional))
+
+        zone_maps = read_zone_maps(BytesIO(self.encode(self.rows)))
+        self.assertEqual([5000] * 4 + [len(self.rows) - 20000], [_.count for _ in zone_maps])
+        self.assertIsNone(zone_maps[0].symbols)
+        self.assertEqual(sum(_[2] for _ in self.rows), sum(_.total.volume for _ in zone_maps))
+        self.assertEqual([], read_zone_maps(BytesIO(self.encode([]))))
+        with self.assertRaises(ValueError):
+            read_zone_maps(BytesIO(b'TRCL\x01\x00'))
+
+    def test_csv_files(self):
+        try:
+            encode_csv(INPUT, 'output/input.trcl')
+            decode_csv('output/input.trcl', 'output/input.csv')
+            with open(INPUT) as expected, open('output/input.csv') as decoded:
+                self.assertEqual(expected.read().splitlines(), decoded.read().splitlines())
+        finally:
+            remove('output/input.trcl')
+            remove('output/input.csv')
+
+
+if __name__ == '__main__':
+    main()
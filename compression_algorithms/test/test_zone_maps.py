@@ -0,0 +1,73 @@
+from unittest import TestCase, main
+from io import BytesIO
+import csv
+from decimal import Decimal
+from compression_algorithms.trade_columns import TradeWriter, read_zone_maps
+from compression_algorithms.zone_maps import aggregate, range_count, range_min, range_max, range_sum, range_vwap
+
+from test_trade_columns import INPUT, CountingBytesIO
+
+
+class TestZoneMaps(TestCase):
+    def setUp(self):
+        with open(INPUT, newline='') as file:
+            self.rows = [(int(ts), symbol, int(quantity), price) for ts, symbol, quantity, price in csv.reader(file)]
+        self.start, self.stop = self.rows[3000][0], self.rows[17000][0]
+
+    def encode(self, symbol_stats=False):
+        file = BytesIO()
+        with TradeWriter(file, 2000, symbol_stats) as writer:
+            writer.write_rows(self.rows)
+        return file.getvalue()
+
+    def selected(self, start=None, stop=None, symbol=None):
+        return [(_[0], _[1], _[2], int(_[3])) for _ in self.rows if (start is None or _[0] >= start) and
+                (stop is None or _[0] < stop) and (symbol is None or _[1] == symbol)]
+
+    def check(self, file, start=None, stop=None, symbol=None):
+        rows = self.selected(start, stop, symbol)
+        self.assertEqual(len(rows), range_count(file, start, stop, symbol))
+        self.assertEqual(min(_[3] for _ in rows), range_min(file, start, stop, symbol))
+        self.assertEqual(max(_[3] for _ in rows), range_max(file, start, stop, symbol))
+        self.assertEqual(sum(_[3] for _ in rows), range_sum(file, start, stop, symbol, 'price'))
+        self.assertEqual(sum(_[2] for _ in rows), range_sum(file, start, stop, symbol))
+        notional = sum(_[2] * _[3] for _ in rows)
+        self.assertEqual(notional, range_sum(file, start, stop, symbol, 'notional'))
+        self.assertEqual(Decimal(notional) / sum(_[2] for _ in rows), range_vwap(file, start, stop, symbol))
+        stats = aggregate(file, start, stop, symbol)
+        self.assertEqual((rows[0][3], rows[-1][3]), (stats.first_price, stats.last_price))
+
+    def test_queries(self):
+        for symbol_stats in (False, True):
+            file = BytesIO(self.encode(symbol_stats))
+            self.check(file)
+            self.check(file, self.start, self.stop)
+            self.check(file, self.start + 1, self.stop - 1, 'bee')
+            self.check(file, None, self.stop, 'ebe')
+
+    def test_empty_ranges(self):
+        file = BytesIO(self.encode())
+        self.assertIsNone(aggregate(file, self.stop, self.start))
+        self.assertEqual(0, range_count(file, symbol='zzz'))
+        self.assertEqual(0, range_sum(file, self.stop, self.start))
+        with self.assertRaises(ValueError):
+            range_max(file, self.stop, self.start)
+        with self.assertRaises(ValueError):
+            range_sum(file, field='quantity')
+
+    def test_edges_only(self):
+        # only the two groups the range boundaries fall into are decoded
+        encoded = self.encode(True)
+        zone_maps = read_zone_maps(BytesIO(encoded))
+        file = CountingBytesIO(encoded)
+        self.assertEqual(sum(_[2] for _ in self.selected(self.start, self.stop, 'bee')),
+                         range_sum(file, self.start, self.stop, 'bee', zone_maps=zone_maps))
+        self.assertLess(file.read_bytes, len(encoded) * 3 / len(zone_maps))
+
+        file = CountingBytesIO(encoded)
+        range_max(file, zone_maps=zone_maps)
+        self.assertEqual(0, file.read_bytes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+from io import BytesIO
+from struct import Struct
+
+from compression_algorithms.varint import append_varint, read_varint
+
+double_struct = Struct('>d')
+bits_struct = Struct('>Q')
+
+# delta of delta buckets: control bits, control bit count, value bits
+TIMESTAMP_BUCKETS = ((0b10, 2, 7), (0b110, 3, 9), (0b1110, 4, 12), (0b11110, 5, 32))
+TIMESTAMP_ESCAPE = (0b11111, 5, 64)
+
+
+class BitWriter(object):
+    def __init__(self, chunk_size=1 << 16):
+        self.chunk_size = chunk_size
+        self.buffer = bytearray()
+        self.bits = 0
+        self.available = 0
+
+    def write(self, value, width):
+        self.bits = (self.bits << width) | (value & ((1 << width) - 1))
+        self.available += width
+        while self.available >= 8:
+            self.available -= 8
+            self.buffer.append((self.bits >> self.available) & 0xff)
+        self.bits &= (1 << self.available) - 1
+
+    def chunks(self):
+        # hands out the complete bytes written so far once enough of them are buffered
+        if len(self.buffer) >= self.chunk_size:
+            chunk = bytes(self.buffer)
+            self.buffer.clear()
+            yield chunk
+
+    def flush(self):
+        if self.available:
+            self.buffer.append((self.bits << (8 - self.available)) & 0xff)
+            self.bits = self.available = 0
+        chunk = bytes(self.buffer)
+        self.buffer.clear()
+        return chunk
+
+
+class BitReader(object):
+    def __init__(self, chunks):
+        if isinstance(chunks, (bytes, bytearray, memoryview)):
+            chunks = (chunks,)
+        self.chunks = iter(chunks)
+        self.chunk = b''
+        self.position = 0
+        self.bits = 0
+        self.available = 0
+
+    def read(self, width):
+        while self.available < width:
+            if self.position == len(self.chunk):
+                self.chunk, self.position = next(self.chunks, None), 0
+                if self.chunk is None:
+                    raise EOFError('truncated bit stream')
+                continue
+            self.bits = (self.bits << 8) | self.chunk[self.position]
+            self.position += 1
+            self.available += 8
+        self.available -= width
+        value = self.bits >> self.available
+        self.bits &= (1 << self.available) - 1
+        return value
+
+
+def to_signed(value, width):
+    return value - (1 << width) if value >> (width - 1) else value
+
+
+def encode_timestamps(values, chunk_size=1 << 16):
+    # the first timestamp is stored whole, every following one as the change of its delta, which is
+    # zero for regular ticks and then costs a single bit
+    writer = BitWriter(chunk_size)
+    previous = delta = None
+    for value in values:
+        if previous is None:
+            writer.write(value, 64)
+            delta = 0
+        else:
+            difference = value - previous - delta
+            delta = value - previous
+            if not difference:
+                writer.write(0, 1)
+            else:
+                for control, control_width, width in TIMESTAMP_BUCKETS + (TIMESTAMP_ESCAPE,):
+                    if -(1 << (width - 1)) < difference <= 1 << (width - 1) or width == 64:
+                        break
+                writer.write(control, control_width)
+                # a bucket of n bits holds [-2 ** (n - 1) + 1, 2 ** (n - 1)], the top value wraps to -2 ** (n - 1)
+                writer.write(difference, width)
+        previous = value
+        yield from writer.chunks()
+    yield writer.flush()
+
+
+def decode_timestamps(chunks, count):
+    reader = BitReader(chunks)
+    previous = delta = None
+    for _ in range(count):
+        if previous is None:
+            value = to_signed(reader.read(64), 64)
+            delta = 0
+        else:
+            difference = 0
+            if reader.read(1):
+                for control, control_width, width in TIMESTAMP_BUCKETS + (TIMESTAMP_ESCAPE,):
+                    if width == 64 or not reader.read(1):
+                        break
+                difference = to_signed(reader.read(width), width)
+                if width < 64 and difference == -(1 << (width - 1)):
+                    difference = 1 << (width - 1)
+            delta += difference
+            value = previous + delta
+        previous = value
+        yield value
+
+
+def leading_zeros(value):
+    return 64 - value.bit_length()
+
+
+def trailing_zeros(value):
+    return (value & -value).bit_length() - 1
+
+
+def encode_floats(values, chunk_size=1 << 16):
+    # every value is xor-ed with the previous one, only the meaningful bits between the leading and
+    # trailing zeros are written, reusing the previous window when they fit inside it
+    writer = BitWriter(chunk_size)
+    previous = None
+    window = None
+    for value in values:
+        bits = bits_struct.unpack(double_struct.pack(value))[0]
+        if previous is None:
+            writer.write(bits, 64)
+        else:
+            xor = bits ^ previous
+            if not xor:
+                writer.write(0, 1)
+            else:
+                leading, trailing = min(leading_zeros(xor), 31), trailing_zeros(xor)
+                if window and leading >= window[0] and trailing >= window[1]:
+                    writer.write(0b10, 2)
+                    leading, trailing = window
+                else:
+                    writer.write(0b11, 2)
+                    writer.write(leading, 5)
+                    # 64 meaningful bits do not fit 6 bits, they are stored as 0
+                    writer.write((64 - leading - trailing) & 0x3f, 6)
+                    window = (leading, trailing)
+                writer.write(xor >> trailing, 64 - leading - trailing)
+        previous = bits
+        yield from writer.chunks()
+    yield writer.flush()
+
+
+def decode_floats(chunks, count):
+    reader = BitReader(chunks)
+    previous = None
+    window = None
+    for _ in range(count):
+        if previous is None:
+            bits = reader.read(64)
+        elif not reader.read(1):
+            bits = previous
+        else:
+            if reader.read(1):
+                leading = reader.read(5)
+                trailing = 64 - leading - (reader.read(6) or 64)
+                window = (leading, trailing)
+            leading, trailing = window
+            bits = previous ^ (reader.read(64 - leading - trailing) << trailing)
+        previous = bits
+        yield double_struct.unpack(bits_struct.pack(bits))[0]
+
+
+def encode_to_bytes(encoder, values):
+    values = values if isinstance(values, (list, tuple)) else list(values)
+    buffer = bytearray()
+    append_varint(buffer, len(values))
+    return bytes(buffer) + b''.join(encoder(values))
+
+
+def decode_from_bytes(decoder, data):
+    file = BytesIO(data) if isinstance(data, (bytes, bytearray, memoryview)) else data
+    count = read_varint(file)
+    yield from decoder(iter(lambda: file.read(1 << 16), b''), count)
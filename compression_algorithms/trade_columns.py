@@ -0,0 +1,288 @@
+import csv
+from collections import namedtuple
+from decimal import Decimal
+from io import BytesIO
+from struct import Struct
+
+import numpy as np
+
+from compression_algorithms.adaptive_encoding import tune, read_exactly
+from compression_algorithms.bit_packing import pack, unpack, pack_fixed_point, unpack_relative
+from compression_algorithms.relative_encoding import to_fixed_point, format_fixed_point
+from compression_algorithms.time_series import encode_timestamps, decode_timestamps
+from compression_algorithms.varint import append_varint, read_varint, zigzag_encode, zigzag_decode, \
+    zigzag_encode_array, zigzag_decode_array, pack_varints, unpack_varints
+
+MAGIC = b'TRCL'
+VERSION = 1
+GROUP_SIZE = 1 << 16
+COLUMNS = ('timestamp', 'symbol', 'quantity', 'price')
+
+# prices are stored per symbol, so putting them back in row order needs the symbol column too
+DEPENDENCIES = {'price': ('symbol',)}
+
+ZONE_MAGIC = b'TRZM'
+# zone map offset, number of row groups, magic
+zone_footer_struct = Struct('<QQ4s')
+
+# aggregates of a row group, for all its rows and for every symbol, prices are Decimals
+Stats = namedtuple('Stats', 'count min_price max_price first_price last_price price_sum volume notional')
+# the timestamp bounds let range queries skip or fully use a group without decoding it
+ZoneMap = namedtuple('ZoneMap', 'offset count min_timestamp max_timestamp total symbols')
+
+
+def encode_symbols(symbols):
+    dictionary, ids = np.unique(np.asarray(symbols, dtype=str), return_inverse=True)
+    names = '\n'.join(dictionary.tolist()).encode('utf-8')
+    buffer = bytearray()
+    append_varint(buffer, len(dictionary))
+    append_varint(buffer, len(names))
+    return bytes(buffer) + names + pack(ids.reshape(-1))
+
+
+def decode_symbols(data):
+    file = BytesIO(data)
+    size = read_varint(file)
+    names = file.read(read_varint(file)).decode('utf-8')
+    dictionary = np.array(names.split('\n') if size else [], dtype=str)
+    return dictionary, unpack(file.read())
+
+
+def encode_prices(prices, symbols):
+    # each symbol's prices form their own relative_encoding series, they move far less from one
+    # trade of a symbol to its next than from one row to the next
+    scaled, exponent = to_fixed_point(prices)
+    _, ids = np.unique(np.asarray(symbols, dtype=str), return_inverse=True)
+    ids = ids.reshape(-1)
+    order = np.argsort(ids, kind='stable')
+    buffer = bytearray()
+    for series in np.split(scaled[order], np.cumsum(np.bincount(ids))[:-1]):
+        tolerance = Decimal(tune(series)).scaleb(-exponent)
+        packed = pack_fixed_point(series, exponent, exponent, tolerance)
+        append_varint(buffer, len(packed))
+        buffer.extend(packed)
+    return bytes(buffer)
+
+
+def decode_prices(data, ids, symbol_count):
+    file = BytesIO(data)
+    series = []
+    exponents = []
+    for _ in range(symbol_count):
+        values, exponent = unpack_relative(file.read(read_varint(file)))
+        series.append(values)
+        exponents.append(exponent)
+    prices = np.empty(len(ids), dtype=np.int64)
+    prices[np.argsort(ids, kind='stable')] = np.concatenate(series) if series else []
+    return prices, exponents[0] if exponents else 0
+
+
+def encode_group(rows):
+    timestamps, symbols, quantities, prices = zip(*rows)
+    chunks = [
+        b''.join(encode_timestamps([int(_) for _ in timestamps])),
+        encode_symbols(symbols),
+        pack(np.asarray(quantities, dtype=np.int64)),
+        encode_prices(prices, symbols),
+    ]
+    buffer = bytearray()
+    append_varint(buffer, len(rows))
+    for chunk in chunks:
+        append_varint(buffer, len(chunk))
+    return bytes(buffer) + b''.join(chunks)
+
+
+def stats_matrix(ids, quantities, prices):
+    # one row per id with count, min, max, first, last, price sum, volume and notional, in the
+    # fixed point of the prices; notional sums stay well inside int64 for row group sized inputs
+    order = np.argsort(ids, kind='stable')
+    counts = np.bincount(ids)
+    present = counts > 0
+    starts = (np.cumsum(counts) - counts)[present]
+    ends = np.cumsum(counts)[present] - 1
+    prices, quantities = prices[order], quantities[order]
+    return np.stack((counts[present], np.minimum.reduceat(prices, starts), np.maximum.reduceat(prices, starts),
+                     prices[starts], prices[ends], np.add.reduceat(prices, starts),
+                     np.add.reduceat(quantities, starts), np.add.reduceat(prices * quantities, starts)), axis=1)
+
+
+def to_stats(row, exponent):
+    count, low, high, first, last, price_sum, volume, notional = (int(_) for _ in row)
+    return Stats(count, *(Decimal(_).scaleb(-exponent) for _ in (low, high, first, last, price_sum)), volume,
+                 Decimal(notional).scaleb(-exponent))
+
+
+def group_stats(symbols, quantities, prices, per_symbol=True):
+    # the first row covers the whole group, the others each symbol of the dictionary
+    quantities = np.asarray(quantities, dtype=np.int64)
+    prices = np.asarray(prices, dtype=np.int64)
+    total = stats_matrix(np.zeros(len(prices), dtype=np.int64), quantities, prices)
+    if not per_symbol:
+        return [], total
+    dictionary, ids = np.unique(np.asarray(symbols, dtype=str), return_inverse=True)
+    return dictionary.tolist(), np.concatenate((total, stats_matrix(ids.reshape(-1), quantities, prices)))
+
+
+def encode_zone_map(offset, timestamps, symbols, quantities, prices, per_symbol=True):
+    scaled, exponent = to_fixed_point(prices)
+    dictionary, matrix = group_stats(symbols, quantities, scaled, per_symbol)
+    names = '\n'.join(dictionary).encode('utf-8')
+    stats = pack_varints(zigzag_encode_array(matrix.reshape(-1)))
+    buffer = bytearray()
+    for field in (offset, len(timestamps), zigzag_encode(min(timestamps)), zigzag_encode(max(timestamps)),
+                  exponent, len(dictionary), len(names)):
+        append_varint(buffer, field)
+    buffer.extend(names)
+    append_varint(buffer, len(stats))
+    return bytes(buffer) + stats
+
+
+def read_zone_maps(file):
+    size = file.seek(0, 2)
+    file.seek(max(size - zone_footer_struct.size, 0))
+    footer = file.read(zone_footer_struct.size)
+    if len(footer) < zone_footer_struct.size or footer[-len(ZONE_MAGIC):] != ZONE_MAGIC:
+        raise ValueError('no zone maps')
+    index_offset, groups, _ = zone_footer_struct.unpack(footer)
+    file.seek(index_offset)
+    zone_maps = []
+    for _ in range(groups):
+        offset, count = read_varint(file), read_varint(file)
+        min_timestamp, max_timestamp = zigzag_decode(read_varint(file)), zigzag_decode(read_varint(file))
+        exponent, size = read_varint(file), read_varint(file)
+        names = file.read(read_varint(file)).decode('utf-8').split('\n')
+        matrix = zigzag_decode_array(unpack_varints(file.read(read_varint(file)))).reshape(size + 1, -1)
+        # a group always has a symbol, so an empty dictionary means that only the totals were kept
+        symbols = {name: to_stats(row, exponent) for name, row in zip(names, matrix[1:])} if size else None
+        zone_maps.append(ZoneMap(offset, count, min_timestamp, max_timestamp, to_stats(matrix[0], exponent),
+                                 symbols))
+    return zone_maps
+
+
+class TradeWriter(object):
+    # rows are (timestamp, symbol, quantity, price) and are buffered into self contained row groups,
+    # the zone maps of all groups follow the terminator so that plain readers never see them,
+    # symbol_stats adds the aggregates of every symbol to them, which costs ~30 bytes per symbol
+    def __init__(self, file, group_size=GROUP_SIZE, symbol_stats=False):
+        self.file = file
+        self.group_size = group_size
+        self.symbol_stats = symbol_stats
+        self.rows = []
+        self.zone_maps = []
+        self.position = len(MAGIC) + 1
+        file.write(MAGIC + bytes((VERSION,)))
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.group_size:
+            self.flush()
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.write(row)
+
+    def flush(self):
+        if self.rows:
+            timestamps, symbols, quantities, prices = zip(*self.rows)
+            self.zone_maps.append(encode_zone_map(self.position, [int(_) for _ in timestamps], symbols,
+                                                  [int(_) for _ in quantities], prices, self.symbol_stats))
+            group = encode_group(self.rows)
+            self.file.write(group)
+            self.position += len(group)
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.file.write(b'\x00')
+        for zone_map in self.zone_maps:
+            self.file.write(zone_map)
+        self.file.write(zone_footer_struct.pack(self.position + 1, len(self.zone_maps), ZONE_MAGIC))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def skip(file, size):
+    if file.seekable():
+        file.seek(size, 1)
+    else:
+        read_exactly(file, size)
+
+
+def needed_columns(columns):
+    unknown = set(columns) - set(COLUMNS)
+    if unknown:
+        raise ValueError('unknown columns %s' % ', '.join(sorted(unknown)))
+    needed = set(columns)
+    for column in columns:
+        needed.update(DEPENDENCIES.get(column, ()))
+    return needed
+
+
+def read_group(file, columns=COLUMNS):
+    # a dict of numpy arrays with only the columns asked for, the chunks of all other columns are
+    # skipped without being read where the file can seek, None once the terminator is reached
+    needed = needed_columns(columns)
+    count = read_varint(file)
+    if not count:
+        return None
+    sizes = [read_varint(file) for _ in COLUMNS]
+    chunks = {}
+    for column, size in zip(COLUMNS, sizes):
+        if column in needed:
+            chunks[column] = read_exactly(file, size)
+        else:
+            skip(file, size)
+
+    group = {}
+    if 'timestamp' in needed:
+        group['timestamp'] = np.fromiter(decode_timestamps((chunks['timestamp'],), count), dtype=np.int64,
+                                         count=count)
+    if 'symbol' in needed:
+        dictionary, ids = decode_symbols(chunks['symbol'])
+        group['symbol'] = dictionary[ids]
+    if 'quantity' in needed:
+        group['quantity'] = unpack(chunks['quantity'])
+    if 'price' in needed:
+        group['price'], group['price_exponent'] = decode_prices(chunks['price'], ids, len(dictionary))
+    return {_: group[_] for _ in group if _ in columns or _ == 'price_exponent' and 'price' in columns}
+
+
+def read_groups(file, columns=COLUMNS):
+    needed_columns(columns)
+    if read_exactly(file, len(MAGIC) + 1) != MAGIC + bytes((VERSION,)):
+        raise ValueError('not a columnar trade file')
+    yield from iter(lambda: read_group(file, columns), None)
+
+
+def group_rows(group):
+    prices = format_fixed_point(group['price'], group['price_exponent']).tolist()
+    return zip(group['timestamp'].tolist(), group['symbol'].tolist(), group['quantity'].tolist(), prices)
+
+
+def read_rows(file):
+    for group in read_groups(file):
+        yield from group_rows(group)
+
+
+def encode_lines(lines):
+    # a single row group from 'timestamp,symbol,quantity,price' lines, for the pipeline 'trades' stage
+    return encode_group([_.split(',') for _ in lines])
+
+
+def decode_lines(payload):
+    return [','.join(map(str, _)) for _ in group_rows(read_group(BytesIO(payload)))]
+
+
+def encode_csv(input_file, output_file, group_size=GROUP_SIZE, symbol_stats=False):
+    with open(input_file, newline='') as rows, open(output_file, 'wb') as file, \
+            TradeWriter(file, group_size, symbol_stats) as writer:
+        writer.write_rows(csv.reader(rows))
+
+
+def decode_csv(input_file, output_file):
+    with open(input_file, 'rb') as file, open(output_file, 'w', newline='') as rows:
+        csv.writer(rows, lineterminator='\n').writerows(read_rows(file))
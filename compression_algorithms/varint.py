@@ -0,0 +1,94 @@
+import numpy as np
+
+# the largest value that still fits in 1, 2, ... 9 varint bytes
+SEVEN_BIT_LIMITS = (np.uint64(1) << np.arange(7, 64, 7, dtype=np.uint64)) - np.uint64(1)
+
+
+def zigzag_encode(value):
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+
+def zigzag_decode(value):
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def append_varint(buffer, value):
+    if value < 0:
+        raise ValueError('varints are unsigned, zigzag encode %d first' % value)
+    while value > 0x7f:
+        buffer.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def iter_varints(file, chunk_size=1 << 16):
+    # once the caller stops, a seekable file is rewound to the end of the last varint it was given
+    # so that whatever follows the varints can still be read
+    value = shift = position = 0
+    chunk = b''
+    try:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            for position, byte in enumerate(chunk, 1):
+                value |= (byte & 0x7f) << shift
+                if byte < 0x80:
+                    yield value
+                    value = shift = 0
+                else:
+                    shift += 7
+        if shift:
+            raise EOFError('truncated varint')
+    finally:
+        if position < len(chunk) and file.seekable():
+            file.seek(position - len(chunk), 1)
+
+
+def read_varint(file):
+    value = shift = 0
+    while True:
+        byte = file.read(1)
+        if not byte:
+            raise EOFError('truncated varint')
+        value |= (byte[0] & 0x7f) << shift
+        if byte[0] < 0x80:
+            return value
+        shift += 7
+
+
+def zigzag_encode_array(values):
+    values = np.asarray(values, dtype=np.int64)
+    return (values.astype(np.uint64) << np.uint64(1)) ^ (values >> 63).astype(np.uint64)
+
+
+def zigzag_decode_array(values):
+    values = np.asarray(values, dtype=np.uint64)
+    return ((values >> np.uint64(1)) ^ (np.uint64(0) - (values & np.uint64(1)))).astype(np.int64)
+
+
+def varint_lengths(values):
+    values = np.asarray(values, dtype=np.uint64)
+    return np.searchsorted(SEVEN_BIT_LIMITS, values) + 1
+
+
+def pack_varints(values):
+    # each value is repeated once per output byte and shifted by 7 bits per byte already written
+    values = np.asarray(values, dtype=np.uint64)
+    lengths = varint_lengths(values)
+    repeated = np.repeat(values, lengths)
+    ends = np.cumsum(lengths)
+    index = np.arange(len(repeated)) - np.repeat(ends - lengths, lengths)
+    more = index < np.repeat(lengths, lengths) - 1
+    groups = (repeated >> (np.uint64(7) * index.astype(np.uint64))) & np.uint64(0x7f)
+    return (groups | (more.astype(np.uint64) << np.uint64(7))).astype(np.uint8).tobytes()
+
+
+def unpack_varints(data):
+    data = np.frombuffer(data, dtype=np.uint8)
+    if len(data) and data[-1] >= 0x80:
+        raise EOFError('truncated varint')
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1)).astype(np.int64)
+    if not len(ends):
+        return np.zeros(0, dtype=np.uint64)
+    index = np.arange(len(data)) - np.repeat(starts, ends - starts + 1)
+    groups = (data & 0x7f).astype(np.uint64) << (np.uint64(7) * index.astype(np.uint64))
+    return np.bitwise_or.reduceat(groups, starts)
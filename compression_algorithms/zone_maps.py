@@ -0,0 +1,95 @@
+import numpy as np
+
+from compression_algorithms.trade_columns import Stats, read_zone_maps, read_group, stats_matrix, to_stats
+
+SUM_FIELDS = {'price': 'price_sum', 'volume': 'volume', 'notional': 'notional'}
+
+
+def covers(zone_map, start, stop):
+    return (start is None or zone_map.min_timestamp >= start) and (stop is None or zone_map.max_timestamp < stop)
+
+
+def overlaps(zone_map, start, stop):
+    return (start is None or zone_map.max_timestamp >= start) and (stop is None or zone_map.min_timestamp < stop)
+
+
+def decode_stats(file, zone_map, start, stop, symbol):
+    # only the columns of the aggregates are read, the rows outside of the range are masked away
+    file.seek(zone_map.offset)
+    group = read_group(file, ('timestamp', 'symbol', 'quantity', 'price'))
+    mask = np.ones(zone_map.count, dtype=bool)
+    if start is not None:
+        mask &= group['timestamp'] >= start
+    if stop is not None:
+        mask &= group['timestamp'] < stop
+    if symbol is not None:
+        mask &= group['symbol'] == symbol
+    if not mask.any():
+        return None
+    quantities = group['quantity'][mask].astype(np.int64)
+    matrix = stats_matrix(np.zeros(len(quantities), dtype=np.int64), quantities, group['price'][mask])
+    return to_stats(matrix[0], group['price_exponent'])
+
+
+def merge(left, right):
+    # the parts are merged in file order, which is what first and last refer to
+    if left is None or right is None:
+        return left or right
+    return Stats(left.count + right.count, min(left.min_price, right.min_price), max(left.max_price, right.max_price),
+                 left.first_price, right.last_price, left.price_sum + right.price_sum, left.volume + right.volume,
+                 left.notional + right.notional)
+
+
+def zone_stats(zone_map, symbol):
+    if symbol is None:
+        return zone_map.total
+    return zone_map.symbols.get(symbol)
+
+
+def aggregate(file, start=None, stop=None, symbol=None, zone_maps=None):
+    # Stats of the trades with start <= timestamp < stop, optionally of a single symbol, or None if
+    # there are none; groups inside the range are answered from their zone maps and only the groups
+    # at its edges (or all overlapping ones for a symbol when no symbol stats were written) are decoded
+    if zone_maps is None:
+        zone_maps = read_zone_maps(file)
+    result = None
+    for zone_map in zone_maps:
+        if not overlaps(zone_map, start, stop):
+            continue
+        if covers(zone_map, start, stop) and (symbol is None or zone_map.symbols is not None):
+            stats = zone_stats(zone_map, symbol)
+        else:
+            stats = decode_stats(file, zone_map, start, stop, symbol)
+        result = merge(result, stats)
+    return result
+
+
+def required(stats):
+    if stats is None:
+        raise ValueError('no trades in range')
+    return stats
+
+
+def range_count(file, start=None, stop=None, symbol=None, zone_maps=None):
+    stats = aggregate(file, start, stop, symbol, zone_maps)
+    return stats.count if stats else 0
+
+
+def range_min(file, start=None, stop=None, symbol=None, zone_maps=None):
+    return required(aggregate(file, start, stop, symbol, zone_maps)).min_price
+
+
+def range_max(file, start=None, stop=None, symbol=None, zone_maps=None):
+    return required(aggregate(file, start, stop, symbol, zone_maps)).max_price
+
+
+def range_sum(file, start=None, stop=None, symbol=None, field='volume', zone_maps=None):
+    if field not in SUM_FIELDS:
+        raise ValueError('unknown field %s' % field)
+    stats = aggregate(file, start, stop, symbol, zone_maps)
+    return getattr(stats, SUM_FIELDS[field]) if stats else 0
+
+
+def range_vwap(file, start=None, stop=None, symbol=None, zone_maps=None):
+    stats = required(aggregate(file, start, stop, symbol, zone_maps))
+    return stats.notional / stats.volume
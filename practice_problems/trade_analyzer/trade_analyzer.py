@@ -1,23 +1,56 @@
+import os
+import sys
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from io import BytesIO
+from itertools import repeat, product
+from string import ascii_lowercase
+
+import numpy as np
+
+# bytes read at a time, rounded up to whole lines
+CHUNK_SIZE = 1 << 20
+# symbols are read into 16 bytes so that longer ones are caught rather than cut to 8
+TRADE_DTYPE = np.dtype([('timestamp', np.int64), ('symbol', 'S16'), ('quantity', np.int64), ('price', np.int64)])
+# the directory of binary/records.py, which is not a package
+RECORDS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'binary')
+# every 3 letter symbol has a fixed slot in the lists of SymbolTable, anything else gets one after them
+SYMBOLS = [''.join(_) for _ in product(ascii_lowercase, repeat=3)]
+SYMBOL_SLOTS = {symbol: i for i, symbol in enumerate(SYMBOLS)}
 
 
 class AnalyzedShare(object):
-    def __init__(self, symbol=None, latest_timestamp=None, max_time_gap=0, total_volume=0, max_trade_price=None):
+    # a summary of the trades of a symbol, which merge() combines with the summary of the trades
+    # that follow them, so that parts of a file can be analyzed apart
+    def __init__(self, symbol=None, latest_timestamp=None, max_time_gap=0, total_volume=0, max_trade_price=None,
+                 first_timestamp=None, total_price=0, total_quantity=0):
         self.symbol = symbol
+        self.first_timestamp = first_timestamp
         self.latest_timestamp = latest_timestamp
         self.max_time_gap = max_time_gap
         self.total_volume = total_volume
         self.max_trade_price = max_trade_price
-        self.share_price_profile = defaultdict(lambda: int(0))
+        self.total_price = total_price
+        self.total_quantity = total_quantity
 
-    def add_to_share_price_profile(self, price, quantity):
-        self.share_price_profile[price] += quantity
+    def add_weighted_price(self, price, quantity):
+        self.total_price += price * quantity
+        self.total_quantity += quantity
 
     def weighted_average_price(self):
-        total_price = sum(p * q for p, q in self.share_price_profile.items())
-        total_quantity = sum(q for _, q in self.share_price_profile.items())
         # Note: in python 3 exactly halfway cases are rounded to the nearest even instead of away from zero
-        return int(total_price / total_quantity)
+        return int(self.total_price / self.total_quantity)
+
+    def merge(self, later):
+        # the gap between the two parts counts like any other gap between consecutive trades
+        self.max_time_gap = max(self.max_time_gap, later.max_time_gap, later.first_timestamp - self.latest_timestamp)
+        self.latest_timestamp = later.latest_timestamp
+        self.total_volume += later.total_volume
+        self.max_trade_price = max(self.max_trade_price, later.max_trade_price)
+        self.total_price += later.total_price
+        self.total_quantity += later.total_quantity
+        return self
 
     def __str__(self):
         return ','.join(str(x) for x in
@@ -25,8 +58,22 @@ class AnalyzedShare(object):
                          self.max_trade_price))
 
 
-def analyze(trades):
+def analyze(trades, final=False, every=None, interval=None, watch=None):
+    # the emission policy, at most one of:
+    # - none: the whole dict after every trade
+    # - final: the whole dict once, after the last trade
+    # - every: the shares that changed in the last N trades
+    # - interval: the shares that changed in the last T milliseconds of trade time, once a trade
+    #   starts a new window, windows are aligned to multiples of T
+    # - watch: the share of a watched symbol after each of its trades
+    # the periodic modes yield the trades left after the last emission at the end, all modes yield
+    # the shares themselves, which go on changing as later trades are analyzed
+    if sum(bool(_) for _ in (final, every, interval, watch is not None)) > 1:
+        raise ValueError('only one emission policy at a time')
     analyzed_shares = defaultdict(AnalyzedShare)
+    changed = {}
+    window = None
+    count = 0
 
     for trade in trades:
         timestamp, symbol, quantity, price = trade.split(',')
@@ -34,8 +81,15 @@ def analyze(trades):
         quantity = int(quantity)
         price = int(price)
 
+        if interval:
+            if window != timestamp // interval and changed:
+                yield changed
+                changed = {}
+            window = timestamp // interval
+
         if symbol not in analyzed_shares:
             analyzed_shares[symbol].symbol = symbol
+            analyzed_shares[symbol].first_timestamp = timestamp
             analyzed_shares[symbol].max_time_gap = 0
             analyzed_shares[symbol].total_volume = quantity
             analyzed_shares[symbol].max_trade_price = price
@@ -51,20 +105,276 @@ def analyze(trades):
                 analyzed_shares[symbol].max_trade_price = price
 
         analyzed_shares[symbol].latest_timestamp = timestamp
-        analyzed_shares[symbol].add_to_share_price_profile(price=price, quantity=quantity)
+        analyzed_shares[symbol].add_weighted_price(price=price, quantity=quantity)
 
         # The reason why yield is placed inside the for loop instead of outside
         # is mainly for flexibility - it allows us to analyze up to any chosen parts of the trade file
+        if every:
+            changed[symbol] = analyzed_shares[symbol]
+            count += 1
+            if count == every:
+                yield changed
+                changed = {}
+                count = 0
+        elif interval:
+            changed[symbol] = analyzed_shares[symbol]
+        elif watch is not None:
+            if symbol in watch:
+                yield {symbol: analyzed_shares[symbol]}
+        elif not final:
+            yield analyzed_shares
+
+    if final:
         yield analyzed_shares
+    elif changed:
+        yield changed
+
+
+class SymbolTable(object):
+    # the state of analyze() in preallocated lists indexed by symbol slot, so its size does not depend
+    # on the trades and a trade updates a few list items instead of the attributes of an object; lists
+    # beat array('q') here as every array access has to box or unbox the int
+    def __init__(self):
+        self.slots = dict(SYMBOL_SLOTS)
+        self.symbols = list(SYMBOLS)
+        self.trades = [0] * len(self.symbols)
+        self.first_timestamp = list(self.trades)
+        self.latest_timestamp = list(self.trades)
+        self.max_time_gap = list(self.trades)
+        self.total_volume = list(self.trades)
+        self.max_trade_price = list(self.trades)
+        self.total_price = list(self.trades)
+
+    def slot(self, symbol):
+        slot = self.slots.get(symbol)
+        if slot is None:
+            slot = self.slots[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            for values in (self.trades, self.first_timestamp, self.latest_timestamp, self.max_time_gap,
+                           self.total_volume, self.max_trade_price, self.total_price):
+                values.append(0)
+        return slot
+
+    def add_trades(self, trades):
+        # 'timestamp,symbol,quantity,price' lines, with the lists in locals as this is the hot loop
+        slots, counts, first_timestamp, latest_timestamp, max_time_gap, total_volume, max_trade_price, \
+            total_price = self.slots, self.trades, self.first_timestamp, self.latest_timestamp, self.max_time_gap, \
+            self.total_volume, self.max_trade_price, self.total_price
+        for trade in trades:
+            timestamp, symbol, quantity, price = trade.split(',')
+            timestamp = int(timestamp)
+            quantity = int(quantity)
+            price = int(price)
+            i = slots.get(symbol)
+            if i is None:
+                i = self.slot(symbol)
+
+            if counts[i]:
+                if max_time_gap[i] < timestamp - latest_timestamp[i]:
+                    max_time_gap[i] = timestamp - latest_timestamp[i]
+                if max_trade_price[i] < price:
+                    max_trade_price[i] = price
+            else:
+                first_timestamp[i] = timestamp
+                max_trade_price[i] = price
+            counts[i] += 1
+            latest_timestamp[i] = timestamp
+            total_volume[i] += quantity
+            total_price[i] += price * quantity
+
+    def share(self, i):
+        return AnalyzedShare(self.symbols[i], self.latest_timestamp[i], self.max_time_gap[i], self.total_volume[i],
+                             self.max_trade_price[i], self.first_timestamp[i], self.total_price[i],
+                             self.total_volume[i])
+
+    def shares(self):
+        return {self.symbols[i]: self.share(i) for i, trades in enumerate(self.trades) if trades}
+
+
+def analyze_table(trades, table=None):
+    # like analyze(), but returns the state of all trades at once as a SymbolTable
+    table = SymbolTable() if table is None else table
+    table.add_trades(trades)
+    return table
+
+
+def parse_chunk(chunk):
+    # (timestamps, symbol keys, quantities, prices) of whole 'timestamp,symbol,quantity,price' lines,
+    # a symbol key is its bytes read as one little endian uint64, which is much faster to group by
+    trades = np.loadtxt(BytesIO(chunk), delimiter=',', dtype=TRADE_DTYPE, ndmin=1)
+    keys = np.ascontiguousarray(trades['symbol']).view(np.uint64).reshape(-1, 2)
+    if np.any(keys[:, 1]):
+        raise ValueError('symbols have at most 8 characters')
+    return trades['timestamp'], keys[:, 0], trades['quantity'], trades['price']
+
+
+def read_chunks(trades, chunk_size=CHUNK_SIZE, size=None):
+    # trades is a binary file, every chunk is extended to the end of its last line; with a size only
+    # that many bytes are read, which have to end at a line boundary
+    while size is None or size > 0:
+        chunk = trades.read(chunk_size if size is None else min(chunk_size, size))
+        if not chunk:
+            return
+        if not chunk.endswith(b'\n'):
+            chunk += trades.readline()
+        if size is not None:
+            size -= len(chunk)
+        if chunk.strip():
+            yield parse_chunk(chunk)
+
+
+class VectorizedAnalysis(object):
+    # the same per symbol results as analyze(), kept in arrays indexed by symbol id and updated a
+    # whole chunk at a time; Σp·q stays in int64, which holds for far more trades than a day has
+    def __init__(self):
+        self.ids = {}
+        self.symbols = []
+        self.first_timestamp = np.zeros(0, dtype=np.int64)
+        self.latest_timestamp = np.zeros(0, dtype=np.int64)
+        self.max_time_gap = np.zeros(0, dtype=np.int64)
+        self.total_volume = np.zeros(0, dtype=np.int64)
+        self.max_trade_price = np.zeros(0, dtype=np.int64)
+        self.total_price = np.zeros(0, dtype=np.int64)
+
+    def symbol_ids(self, keys):
+        # symbol ids in order of appearance, from the keys of parse_chunk
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        unique_keys = unique_keys.tolist()
+        for key in unique_keys:
+            if key not in self.ids:
+                self.ids[key] = len(self.symbols)
+                self.symbols.append(key.to_bytes(8, 'little').rstrip(b'\0').decode())
+        grow = len(self.symbols) - len(self.total_volume)
+        if grow:
+            self.first_timestamp = np.append(self.first_timestamp, np.zeros(grow, dtype=np.int64))
+            self.latest_timestamp = np.append(self.latest_timestamp, np.zeros(grow, dtype=np.int64))
+            self.max_time_gap = np.append(self.max_time_gap, np.zeros(grow, dtype=np.int64))
+            self.total_volume = np.append(self.total_volume, np.zeros(grow, dtype=np.int64))
+            self.max_trade_price = np.append(self.max_trade_price, np.full(grow, np.iinfo(np.int64).min))
+            self.total_price = np.append(self.total_price, np.zeros(grow, dtype=np.int64))
+        return np.array([self.ids[_] for _ in unique_keys], dtype=np.int64)[inverse.reshape(-1)]
+
+    def add_chunk(self, timestamps, keys, quantities, prices):
+        if not len(timestamps):
+            return
+        seen = len(self.symbols)
+        ids = self.symbol_ids(keys)
+        # grouping the chunk by symbol keeps the trades of every symbol in file order
+        order = np.argsort(ids, kind='stable')
+        ids, timestamps, quantities, prices = ids[order], timestamps[order], quantities[order], prices[order]
+        starts = np.flatnonzero(np.diff(ids, prepend=-1))
+        ends = np.append(starts[1:], len(ids)) - 1
+        group_ids = ids[starts]
+
+        # the first trade of a symbol in a chunk follows the last one of the previous chunks,
+        # unless the symbol is new, which has no gap at all
+        previous = np.roll(timestamps, 1)
+        previous[starts] = self.latest_timestamp[group_ids]
+        new = starts[group_ids >= seen]
+        previous[new] = timestamps[new]
+        self.first_timestamp[ids[new]] = timestamps[new]
+        gaps = timestamps - previous
+
+        self.max_time_gap[group_ids] = np.maximum(self.max_time_gap[group_ids], np.maximum.reduceat(gaps, starts))
+        self.total_volume[group_ids] += np.add.reduceat(quantities, starts)
+        self.max_trade_price[group_ids] = np.maximum(self.max_trade_price[group_ids],
+                                                     np.maximum.reduceat(prices, starts))
+        self.total_price[group_ids] += np.add.reduceat(prices * quantities, starts)
+        self.latest_timestamp[group_ids] = timestamps[ends]
+
+    def shares(self):
+        return {symbol: AnalyzedShare(symbol, int(self.latest_timestamp[i]), int(self.max_time_gap[i]),
+                                      int(self.total_volume[i]), int(self.max_trade_price[i]),
+                                      int(self.first_timestamp[i]), int(self.total_price[i]),
+                                      int(self.total_volume[i]))
+                for i, symbol in enumerate(self.symbols)}
+
+    def lines(self):
+        # sorted by symbol like analyze_file, the average goes through python ints to round the same way
+        for symbol, i in sorted(zip(self.symbols, range(len(self.symbols)))):
+            total_volume = int(self.total_volume[i])
+            yield ','.join(str(x) for x in
+                           (symbol, int(self.max_time_gap[i]), total_volume,
+                            int(int(self.total_price[i]) / total_volume), int(self.max_trade_price[i])))
+
+
+def analyze_parsed(chunks):
+    # chunks of (timestamps, symbol keys, quantities, prices) arrays as parse_chunk returns them
+    analysis = VectorizedAnalysis()
+    for chunk in chunks:
+        analysis.add_chunk(*chunk)
+    return analysis
+
+
+def analyze_chunks(trades, chunk_size=CHUNK_SIZE, size=None):
+    return analyze_parsed(read_chunks(trades, chunk_size, size))
+
+
+def analyze_file_vectorized(file, output_file, chunk_size=CHUNK_SIZE):
+    with open(file, 'rb') as trades:
+        write_output_file(output_file, analyze_chunks(trades, chunk_size).lines())
+
+
+def analyze_file_records(file, output_file):
+    # a file of fixed width trade records from binary/records.py, read through mmap without parsing any text
+    if RECORDS_DIRECTORY not in sys.path:
+        sys.path.append(RECORDS_DIRECTORY)
+    import records
+
+    with records.open_records(file) as trades:
+        analysis = analyze_parsed(records.trade_chunks(trades))
+    write_output_file(output_file, analysis.lines())
+
+
+def merge_analyses(earlier, later):
+    # merges the analyzed shares of a part of a file into those of the part before it
+    for symbol, analyzed_share in later.items():
+        if symbol in earlier:
+            earlier[symbol].merge(analyzed_share)
+        else:
+            earlier[symbol] = analyzed_share
+    return earlier
+
+
+def shard_offsets(file, shards):
+    # offsets that split the file into about equal parts, each moved forward to the start of a line
+    size = os.path.getsize(file)
+    offsets = [0]
+    with open(file, 'rb') as trades:
+        for shard in range(1, shards):
+            trades.seek(max(size * shard // shards - 1, offsets[-1]))
+            trades.readline()
+            offsets.append(min(trades.tell(), size))
+    return sorted(set(offsets + [size]))
+
+
+def analyze_shard(file, start, stop, chunk_size=CHUNK_SIZE):
+    with open(file, 'rb') as trades:
+        trades.seek(start)
+        return analyze_chunks(trades, chunk_size, stop - start).shares()
+
+
+def analyze_file_sharded(file, output_file, processes=None, shards=None, chunk_size=CHUNK_SIZE):
+    # the shards are analyzed in parallel and merged in file order, so each shard only needs to fit in memory
+    # a chunk at a time, like the whole file does for analyze_file_vectorized
+    processes = processes or os.cpu_count()
+    offsets = shard_offsets(file, shards or processes)
+    with ProcessPoolExecutor(processes) as executor:
+        results = executor.map(analyze_shard, repeat(file), offsets[:-1], offsets[1:], repeat(chunk_size))
+        analyzed_shares = reduce(merge_analyses, results, {})
+    write_output_file(output_file, (str(x) for _, x in sorted(analyzed_shares.items())))
+
+
+def analyze_file_table(file, output_file):
+    with open(file) as trades:
+        write_output_file(output_file, (str(x) for _, x in sorted(analyze_table(trades).shares().items())))
 
 
 def analyze_file(file, output_file):
     with open(file) as trades:
         # traversing through the whole file to analyze the whole file
         # (or we could traverse through only part of the file if needed)
-        analyzed_shares = None
-        for analyzed_shares in analyze(trades):
-            pass
+        analyzed_shares, = analyze(trades, final=True)
 
         # for _, analyzed_share in sorted(analyzed_shares.items()):
         #     print(analyzed_share)
@@ -76,9 +386,11 @@ def write_output_file(output_file, analyzed_shares):
         file.write('\n'.join(analyzed_shares))
 
 
-print("Analyzing sample input file, writing output to sample-output.csv")
-analyze_file('sample-input.txt', 'sample-output.csv')
+# the worker processes of analyze_file_sharded import this module, which must not analyze again
+if __name__ == '__main__':
+    print("Analyzing sample input file, writing output to sample-output.csv")
+    analyze_file('sample-input.txt', 'sample-output.csv')
 
-print()
-print("Analyzing main input file, writing output to output.csv")
-analyze_file('input.csv', 'output.csv')
+    print()
+    print("Analyzing main input file, writing output to output.csv")
+    analyze_file('input.csv', 'output.csv')